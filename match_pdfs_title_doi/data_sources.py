@@ -12,13 +12,141 @@ Date: 2025-01-20
 
 import csv
 import logging
+import queue
+import sys
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
 
 
-@dataclass
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:  # pyarrow 为可选依赖，缺失时使用纯 Python 解析
+    pa = None
+
+
+# CSV 读取缓冲区大小（1 MiB），减少大文件的 read() 系统调用次数
+CSV_READ_BUFFER_SIZE = 1 << 20
+
+# pyarrow 每次解析的数据块大小（8 MiB）
+ARROW_BLOCK_SIZE = 8 << 20
+
+# MongoDB 游标每批读取的文档数（默认首批仅 101 条）
+MONGO_BATCH_SIZE = 6000
+
+# MongoDB 后台预取的最大批次数
+MONGO_PREFETCH_BATCHES = 2
+
+
+def read_csv_arrow(csv_path: Path, encoding: str = 'utf-8-sig') -> Optional['pa.Table']:
+    """
+    使用 pyarrow 批量解析 CSV 文件（所有列均按字符串读取）
+    
+    Args:
+        csv_path: CSV 文件路径
+        encoding: 文件编码
+        
+    Returns:
+        pyarrow.Table；pyarrow 未安装或文件无法按规整表格解析时返回 None，
+        调用方应回退到 csv 模块
+    """
+    if pa is None:
+        return None
+    
+    # 先读取表头，保证所有列都按字符串解析（与 csv 模块行为一致）
+    with open(csv_path, 'r', encoding=encoding, newline='') as f:
+        headers = next(csv.reader(f), None)
+    if not headers:
+        return None
+    
+    # pyarrow 会自动跳过 UTF-8 BOM
+    arrow_encoding = 'utf8' if encoding.lower().replace('_', '-') in (
+        'utf-8', 'utf8', 'utf-8-sig'
+    ) else encoding
+    
+    try:
+        return pacsv.read_csv(
+            csv_path,
+            read_options=pacsv.ReadOptions(
+                block_size=ARROW_BLOCK_SIZE,
+                encoding=arrow_encoding,
+            ),
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(
+                column_types={h: pa.string() for h in headers},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # 列数不一致等不规整文件交给 csv 模块处理
+        return None
+
+
+class RowView:
+    """
+    csv.reader 行的只读视图
+    
+    按表头名访问字段，取值规则与 csv.DictReader 一致（表头中有但行中缺失的列为 None）。
+    扫描时复用同一个实例，只在需要交出数据时才用 to_dict() 构造 dict。
+    """
+    __slots__ = ('row', 'fieldnames', 'index')
+    
+    def __init__(self, fieldnames: List[str]):
+        self.row: List[str] = []
+        self.fieldnames = fieldnames
+        self.index = {name: i for i, name in enumerate(fieldnames)}
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        i = self.index.get(key)
+        if i is None:
+            return default
+        row = self.row
+        return row[i] if i < len(row) else None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """构造与 csv.DictReader 相同的 dict（多出的值放在 None 键下）"""
+        return _row_to_dict(self.fieldnames, self.row)
+
+
+def _row_to_dict(fieldnames: List[str], row: Sequence[Any]) -> Dict[str, Any]:
+    """按 csv.DictReader 的规则把一行值转换为 dict"""
+    d = dict(zip(fieldnames, row))
+    lf, lr = len(fieldnames), len(row)
+    if lf < lr:
+        d[None] = list(row[lf:])
+    elif lf > lr:
+        for key in fieldnames[lr:]:
+            d[key] = None
+    return d
+
+
+def read_row_views(f: Iterable[str]) -> Tuple[List[str], Iterator[RowView]]:
+    """
+    以 csv.reader 读取已打开的 CSV 文件
+    
+    Returns:
+        (表头, 行视图迭代器)；迭代器每次产出同一个 RowView，空行被跳过
+    """
+    reader = csv.reader(f)
+    # 表头驻留：所有按列名的字典查找都能按对象身份直接命中
+    fieldnames = [sys.intern(name) for name in next(reader, [])]
+    view = RowView(fieldnames)
+    
+    def iter_views() -> Iterator[RowView]:
+        for row in reader:
+            if row:
+                view.row = row
+                yield view
+    
+    return fieldnames, iter_views()
+
+
+@dataclass(slots=True)
 class FieldMapping:
     """
     字段映射配置
@@ -43,7 +171,7 @@ CSV_FIELD_MAPPING = FieldMapping(title='Title', doi='DOI', uuid='')
 MONGODB_FIELD_MAPPING = FieldMapping(title='label', doi='doi', uuid='uuid')
 
 
-@dataclass
+@dataclass(slots=True)
 class Record:
     """
     文献记录数据类
@@ -70,9 +198,110 @@ class Record:
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         return self.data.copy()
+    
+    def to_dict_with(self, **extra: Any) -> Dict[str, Any]:
+        """转换为字典并附加额外字段（一次构造，无需先复制再修改）"""
+        return {**self.data, **extra}
 
 
-@dataclass
+class RowRecord(Record):
+    """
+    CSV 行记录
+    
+    字段值保存为一行的值序列，列位置由同一文件所有记录共享的表头索引给出，
+    不为每条记录单独构造 dict。接口与 Record 相同，取值规则与 csv.DictReader 一致。
+    首次访问 data 时才构造 dict 并保存，此后所有读写都经过这个 dict，
+    因此 record.data[key] = value 的修改会保留。与内容相同的 Record 相等。
+    """
+    __slots__ = ('values', 'fieldnames', 'index', '_data')
+    
+    def __init__(
+        self,
+        values: Sequence[Any],
+        fieldnames: List[str],
+        index: Dict[str, int],
+        source_id: Optional[str] = None
+    ):
+        self.values = values
+        self.fieldnames = fieldnames
+        self.index = index
+        self.source_id = source_id
+        self._data: Optional[Dict[str, Any]] = None
+    
+    @property
+    def data(self) -> Dict[str, Any]:
+        data = self._data
+        if data is None:
+            data = self._data = _row_to_dict(self.fieldnames, self.values)
+        return data
+    
+    @data.setter
+    def data(self, value: Dict[str, Any]) -> None:
+        self._data = value
+    
+    def __getstate__(self):
+        return (self.values, self.fieldnames, self.index, self.source_id, self._data)
+    
+    def __setstate__(self, state) -> None:
+        self.values, self.fieldnames, self.index, self.source_id, self._data = state
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Record):
+            return NotImplemented
+        return self.source_id == other.source_id and self.to_dict() == other.to_dict()
+    
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return f"RowRecord(data={self.to_dict()!r}, source_id={self.source_id!r})"
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """获取字段值"""
+        if self._data is not None:
+            return self._data.get(key, default)
+        i = self.index.get(key)
+        if i is None:
+            return self.data.get(key, default) if key is None else default
+        values = self.values
+        return values[i] if i < len(values) else None
+    
+    def __getitem__(self, key: str) -> Any:
+        if self._data is not None:
+            return self._data[key]
+        i = self.index.get(key)
+        if i is None:
+            return self.data[key]
+        values = self.values
+        return values[i] if i < len(values) else None
+    
+    def __contains__(self, key: str) -> bool:
+        if self._data is not None:
+            return key in self._data
+        if key is None:
+            return len(self.values) > len(self.fieldnames)
+        return key in self.index
+    
+    def copy(self) -> 'RowRecord':
+        """创建副本（共享表头索引）"""
+        record = RowRecord(list(self.values), self.fieldnames, self.index, self.source_id)
+        if self._data is not None:
+            record._data = self._data.copy()
+        return record
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        if self._data is not None:
+            return self._data.copy()
+        return _row_to_dict(self.fieldnames, self.values)
+    
+    def to_dict_with(self, **extra: Any) -> Dict[str, Any]:
+        """转换为字典并附加额外字段"""
+        d = self.to_dict()
+        d.update(extra)
+        return d
+
+
+@dataclass(slots=True)
 class DataSourceResult:
     """
     数据源查询结果
@@ -101,7 +330,16 @@ class DataSource(ABC):
         logger: Optional[logging.Logger] = None
     ):
         self.field_mapping = field_mapping or CSV_FIELD_MAPPING
-        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.logger = logger or self._class_logger()
+    
+    @classmethod
+    def _class_logger(cls) -> logging.Logger:
+        """按类缓存默认日志记录器（只查找子类自身的缓存，不继承父类的）"""
+        class_logger = cls.__dict__.get('_default_logger')
+        if class_logger is None:
+            class_logger = logging.getLogger(cls.__name__)
+            cls._default_logger = class_logger
+        return class_logger
     
     @abstractmethod
     def connect(self) -> bool:
@@ -122,6 +360,19 @@ class DataSource(ABC):
         """获取记录"""
         pass
     
+    def iter_records(
+        self,
+        source_identifier: str = "",
+        query: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Record]:
+        """
+        逐条返回记录
+        
+        默认实现基于 get_records()；支持流式读取的数据源应覆盖此方法，
+        只需单次遍历记录的调用方可借此避免在内存中累积全部记录。
+        """
+        yield from self.get_records(source_identifier, query).records
+    
     @abstractmethod
     def get_available_sources(self) -> List[str]:
         """获取所有可用的数据源标识"""
@@ -206,6 +457,80 @@ class CSVDataSource(DataSource):
         self._connected = False
         self.logger.debug("CSV 数据源已断开")
     
+    def _resolve_csv_path(self, source_identifier: str = "") -> Path:
+        """确定要读取的 CSV 文件路径"""
+        if source_identifier:
+            csv_path = Path(source_identifier)
+            if not csv_path.is_absolute() and self.csv_dir:
+                csv_path = self.csv_dir / csv_path
+            return csv_path
+        if self._csv_files:
+            return self._csv_files[0]
+        raise ValueError("没有可用的 CSV 文件")
+    
+    def _open_csv(self, csv_path: Path):
+        """以大缓冲区打开 CSV 文件"""
+        return open(csv_path, 'r', encoding=self.encoding, newline='',
+                    buffering=CSV_READ_BUFFER_SIZE)
+    
+    def _iter_reader(
+        self,
+        fieldnames: List[str],
+        views: Iterator[RowView],
+        source_id: str,
+        query: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Record]:
+        """将 csv 行逐条转换为 RowRecord，同一文件的记录共享表头索引"""
+        index = {name: i for i, name in enumerate(fieldnames)}
+        query_items = list(query.items()) if query else []
+        if query_items:
+            # 不在表头中的字段取值恒为 None，可在读取前一次性判定
+            if any(v is not None for k, v in query_items if k not in fieldnames):
+                return
+            query_items = [(k, v) for k, v in query_items if k in fieldnames]
+        
+        if not query_items:
+            for view in views:
+                yield RowRecord(view.row, fieldnames, index, source_id)
+        elif len(query_items) == 1:
+            (qk, qv), = query_items
+            for view in views:
+                if view.get(qk) != qv:
+                    continue
+                yield RowRecord(view.row, fieldnames, index, source_id)
+        else:
+            for view in views:
+                for k, v in query_items:
+                    if view.get(k) != v:
+                        break
+                else:
+                    yield RowRecord(view.row, fieldnames, index, source_id)
+    
+    def iter_records(
+        self,
+        source_identifier: str = "",
+        query: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Record]:
+        """
+        逐条读取 CSV 文件的记录（流式，不在内存中累积）
+        
+        Args:
+            source_identifier: CSV 文件路径，为空时使用第一个文件
+            query: 可选的过滤条件
+            
+        Yields:
+            Record
+        """
+        csv_path = self._resolve_csv_path(source_identifier)
+        
+        try:
+            with self._open_csv(csv_path) as f:
+                fieldnames, views = read_row_views(f)
+                yield from self._iter_reader(fieldnames, views, csv_path.stem, query)
+        except Exception as e:
+            self.logger.error(f"读取 CSV 文件 {csv_path} 时出错: {e}")
+            raise
+    
     def get_records(
         self,
         source_identifier: str = "",
@@ -221,36 +546,19 @@ class CSVDataSource(DataSource):
         Returns:
             DataSourceResult
         """
-        # 确定要读取的文件
-        if source_identifier:
-            csv_path = Path(source_identifier)
-            if not csv_path.is_absolute() and self.csv_dir:
-                csv_path = self.csv_dir / csv_path
-        elif self._csv_files:
-            csv_path = self._csv_files[0]
-        else:
-            raise ValueError("没有可用的 CSV 文件")
-        
-        records = []
-        headers = []
+        csv_path = self._resolve_csv_path(source_identifier)
         
         try:
-            with open(csv_path, 'r', encoding=self.encoding) as f:
-                reader = csv.DictReader(f)
-                headers = list(reader.fieldnames or [])
-                
-                for row in reader:
-                    if query:
-                        match = all(row.get(k) == v for k, v in query.items())
-                        if not match:
-                            continue
-                    
-                    records.append(Record(
-                        data=dict(row),
-                        source_id=csv_path.stem
-                    ))
+            loaded = self._read_records_arrow(csv_path, query)
+            if loaded is not None:
+                headers, records = loaded
+            else:
+                with self._open_csv(csv_path) as f:
+                    headers, views = read_row_views(f)
+                    records = list(self._iter_reader(headers, views, csv_path.stem, query))
             
-            self.logger.debug(f"从 {csv_path.name} 读取 {len(records)} 条记录")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"从 {csv_path.name} 读取 {len(records)} 条记录")
             
         except Exception as e:
             self.logger.error(f"读取 CSV 文件 {csv_path} 时出错: {e}")
@@ -263,6 +571,48 @@ class CSVDataSource(DataSource):
             field_mapping=self.field_mapping
         )
     
+    def _read_records_arrow(
+        self,
+        csv_path: Path,
+        query: Optional[Dict[str, Any]] = None
+    ) -> Optional[Tuple[List[str], List[Record]]]:
+        """
+        使用 pyarrow 读取记录，过滤在列上向量化完成
+        
+        Returns:
+            (headers, records)；无法使用 pyarrow 时返回 None
+        """
+        if pa is None:
+            return None
+        
+        # 仅支持对已有列做字符串等值过滤，其余情况交给 Python 路径
+        if query and not all(isinstance(v, str) for v in query.values()):
+            return None
+        
+        table = read_csv_arrow(csv_path, self.encoding)
+        if table is None:
+            return None
+        
+        headers = table.column_names
+        if query:
+            if not all(k in headers for k in query):
+                return None
+            mask = None
+            for k, v in query.items():
+                cond = pc.equal(table[k], v)
+                mask = cond if mask is None else pc.and_(mask, cond)
+            table = table.filter(mask)
+        
+        source_id = csv_path.stem
+        headers = [sys.intern(name) for name in headers]
+        index = {name: i for i, name in enumerate(headers)}
+        columns = [column.to_pylist() for column in table.columns]
+        records = [
+            RowRecord(values, headers, index, source_id)
+            for values in zip(*columns)
+        ]
+        return headers, records
+    
     def get_available_sources(self) -> List[str]:
         """获取所有 CSV 文件路径"""
         return [str(f) for f in self._csv_files]
@@ -282,7 +632,10 @@ class MongoDBDataSource(DataSource):
         database: str,
         collection: str = "",
         field_mapping: Optional[FieldMapping] = None,
-        logger: Optional[logging.Logger] = None
+        logger: Optional[logging.Logger] = None,
+        project_fields: bool = False,
+        batch_size: int = MONGO_BATCH_SIZE,
+        ensure_indexes: bool = False
     ):
         """
         初始化 MongoDB 数据源
@@ -293,14 +646,34 @@ class MongoDBDataSource(DataSource):
             collection: 集合名称（可选，也可在 get_records 时指定）
             field_mapping: 字段映射配置，默认使用 MongoDB 映射
             logger: 日志记录器
+            project_fields: 是否只读取映射字段（title/doi/uuid），默认读取完整文档
+            batch_size: 游标每批读取的文档数
+            ensure_indexes: 连接后是否为集合的 title/doi/uuid 字段创建索引
         """
         super().__init__(field_mapping or MONGODB_FIELD_MAPPING, logger)
         self.connection_string = connection_string
         self.database_name = database
         self.collection_name = collection
+        self.project_fields = project_fields
+        self.batch_size = batch_size
+        self.ensure_indexes = ensure_indexes
         self._client = None
         self._db = None
     
+    @property
+    def _projection(self) -> Optional[Dict[str, int]]:
+        """
+        由字段映射构建的投影，读取完整文档（默认）时为 None
+        
+        映射了 uuid 字段时由 uuid 标识记录，不再返回 _id。
+        """
+        if not self.project_fields:
+            return None
+        fields = [self.field_mapping.title, self.field_mapping.doi, self.field_mapping.uuid]
+        projection = {name: 1 for name in fields if name}
+        projection['_id'] = 0 if self.field_mapping.uuid else 1
+        return projection
+    
     @property
     def source_type(self) -> str:
         return "mongodb"
@@ -317,6 +690,9 @@ class MongoDBDataSource(DataSource):
             self._client.admin.command('ping')
             
             self.logger.info(f"MongoDB 已连接: {self.database_name}")
+            
+            if self.ensure_indexes and self.collection_name:
+                self.create_indexes(self.collection_name)
             return True
             
         except ImportError:
@@ -326,6 +702,34 @@ class MongoDBDataSource(DataSource):
             self.logger.error(f"MongoDB 连接失败: {e}")
             return False
     
+    def create_indexes(self, collection_name: str = "") -> List[str]:
+        """
+        为映射的 title/doi/uuid 字段创建单字段索引（已存在时不会重复创建）
+        
+        没有建索引权限时只记录警告。
+        
+        Returns:
+            成功创建或确认存在的索引名称列表
+        """
+        if self._db is None:
+            raise RuntimeError("MongoDB 未连接")
+        
+        from pymongo.errors import OperationFailure
+        
+        collection = self._db[collection_name or self.collection_name]
+        fields = [self.field_mapping.doi, self.field_mapping.title, self.field_mapping.uuid]
+        
+        index_names = []
+        for field_name in dict.fromkeys(f for f in fields if f):
+            try:
+                index_names.append(collection.create_index([(field_name, 1)]))
+            except OperationFailure as e:
+                self.logger.warning(f"无法为 {collection.name}.{field_name} 创建索引: {e}")
+        
+        if index_names:
+            self.logger.debug(f"MongoDB 索引: {', '.join(index_names)}")
+        return index_names
+    
     def disconnect(self) -> None:
         """断开 MongoDB 连接"""
         if self._client:
@@ -334,49 +738,69 @@ class MongoDBDataSource(DataSource):
             self._db = None
             self.logger.debug("MongoDB 已断开")
     
-    def get_records(
+    def _resolve_collection(self, source_identifier: str = "") -> str:
+        """确定要读取的集合名称"""
+        if self._db is None:
+            raise RuntimeError("MongoDB 未连接")
+        
+        collection_name = source_identifier or self.collection_name
+        if not collection_name:
+            raise ValueError("未指定集合名称")
+        return collection_name
+    
+    def iter_records(
         self,
         source_identifier: str = "",
         query: Optional[Dict[str, Any]] = None
-    ) -> DataSourceResult:
+    ) -> Iterator[Record]:
         """
-        从 MongoDB 集合获取记录
+        逐条读取集合中的记录（流式，不在内存中累积）
         
         Args:
             source_identifier: 集合名称，为空时使用初始化时的 collection
             query: MongoDB 查询条件
             
-        Returns:
-            DataSourceResult
+        Yields:
+            Record
         """
-        if self._db is None:
-            raise RuntimeError("MongoDB 未连接")
-        
-        collection_name = source_identifier or self.collection_name
-        if not collection_name:
-            raise ValueError("未指定集合名称")
-        
+        collection_name = self._resolve_collection(source_identifier)
         collection = self._db[collection_name]
-        mongo_query = query or {}
-        
-        records = []
-        headers = set()
         
-        cursor = collection.find(mongo_query)
-        
-        for doc in cursor:
-            doc_dict = dict(doc)
+        for doc_dict in self._iter_documents(collection, query or {}, self._projection):
             # 将 _id 转为字符串
             if '_id' in doc_dict:
                 doc_dict['_id'] = str(doc_dict['_id'])
+            yield Record(data=doc_dict, source_id=collection_name)
+    
+    def get_records(
+        self,
+        source_identifier: str = "",
+        query: Optional[Dict[str, Any]] = None
+    ) -> DataSourceResult:
+        """
+        从 MongoDB 集合获取记录
+        
+        Args:
+            source_identifier: 集合名称，为空时使用初始化时的 collection
+            query: MongoDB 查询条件
             
-            headers.update(doc_dict.keys())
-            records.append(Record(
-                data=doc_dict,
-                source_id=collection_name
-            ))
+        Returns:
+            DataSourceResult
+        """
+        collection_name = self._resolve_collection(source_identifier)
+        projection = self._projection
         
-        self.logger.debug(f"从集合 {collection_name} 读取 {len(records)} 条记录")
+        records = list(self.iter_records(collection_name, query))
+        # 使用投影时表头固定，无需逐条收集文档的键
+        if projection:
+            headers = {name for name, included in projection.items() if included}
+        else:
+            headers = set()
+            for record in records:
+                headers.update(record.data.keys())
+        
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"从集合 {collection_name} 读取 {len(records)} 条记录")
         
         return DataSourceResult(
             records=records,
@@ -385,6 +809,68 @@ class MongoDBDataSource(DataSource):
             field_mapping=self.field_mapping
         )
     
+    def _iter_documents(
+        self,
+        collection,
+        mongo_query: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        逐条返回集合中的文档，网络读取与文档处理重叠进行
+        
+        后台线程通过 find_raw_batches 预取下一批原始 BSON，
+        主线程在处理当前批次的同时，下一批已在传输中。
+        """
+        import bson
+        
+        batches: queue.Queue = queue.Queue(maxsize=MONGO_PREFETCH_BATCHES)
+        stop = threading.Event()
+        done = object()
+        
+        def offer(item) -> bool:
+            # 队列已满时等待消费，消费方提前退出时放弃
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        def produce():
+            try:
+                cursor = collection.find_raw_batches(
+                    mongo_query,
+                    projection=projection,
+                    batch_size=self.batch_size
+                )
+                try:
+                    for raw_batch in cursor:
+                        if not offer(raw_batch):
+                            return
+                finally:
+                    cursor.close()
+                offer(done)
+            except BaseException as e:  # 将异常传回主线程
+                offer(e)
+        
+        # 与 find() 一样按集合的编解码选项（tz_aware、uuidRepresentation、document_class 等）解码
+        codec_options = collection.codec_options
+        producer = threading.Thread(target=produce, name="mongo-prefetch", daemon=True)
+        producer.start()
+        
+        try:
+            while True:
+                item = batches.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield from bson.decode_all(item, codec_options)
+        finally:
+            stop.set()
+            producer.join()
+    
     def get_available_sources(self) -> List[str]:
         """获取所有集合名称"""
         if self._db is None:
@@ -12,25 +12,262 @@ Date: 2025-01-20
 from __future__ import annotations
 
 import csv
+import ctypes
+import errno
+import functools
+import json
 import logging
+import os
 import shutil
+import sys
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, TYPE_CHECKING
+from typing import (
+    Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple,
+    TYPE_CHECKING, Union,
+)
+
+try:
+    from .data_sources import CSV_READ_BUFFER_SIZE, RowView, read_csv_arrow, read_row_views
+except ImportError:
+    from data_sources import CSV_READ_BUFFER_SIZE, RowView, read_csv_arrow, read_row_views
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow 为可选依赖
+    pa = None
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，回退到标准库 json
+    orjson = None
+
+try:
+    import xxhash
+    
+    def _key_hash(key: str) -> int:
+        return xxhash.xxh64_intdigest(key.encode('utf-8', 'surrogatepass'))
+except ImportError:  # xxhash 为可选依赖，回退到内置的 64 位字符串哈希
+    _key_hash = hash
 
 if TYPE_CHECKING:
     from .matcher import BatchMatchResult, MatchResult
-    from .data_sources import FieldMapping
+    from .data_sources import FieldMapping, Record
+
+
+# CSV 写入缓冲区大小（1 MiB）
+CSV_WRITE_BUFFER_SIZE = 1 << 20
 
+# JSONL 写入缓冲区大小（1 MiB）
+JSONL_WRITE_BUFFER_SIZE = 1 << 20
 
+# 复制 PDF 时每完成多少个文件输出一次进度
+COPY_PROGRESS_INTERVAL = 500
+
+
+_HTTP_PREFIX = ('http://', 'https://')
+_DOI_BASE = "https://doi.org/"
+
+
+@functools.lru_cache(maxsize=65536)
 def generate_doi_url(doi: str) -> str:
-    """根据 DOI 生成下载链接"""
-    if not doi or not doi.strip():
+    """根据 DOI 生成下载链接（重复 DOI 直接命中缓存）"""
+    if not doi:
+        return ""
+    s = doi.strip()
+    if not s:
         return ""
-    doi = doi.strip()
-    if doi.startswith('http'):
-        return doi
-    return f"https://doi.org/{doi}"
+    if s.startswith(_HTTP_PREFIX):
+        return s
+    return _DOI_BASE + s
+
+
+def _dumps_jsonl(row: Dict[str, Any]) -> bytes:
+    """将一行记录序列化为 JSONL 字节串（含换行）"""
+    if orjson is not None:
+        # 值多于表头的 CSV 行会带 None 键，与 json.dumps 一样序列化为 "null"
+        return orjson.dumps(
+            row, default=str, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+        )
+    return (json.dumps(row, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+
+
+# copy_file_range / sendfile 不可用时应回退到其他复制方式的错误码
+_COPY_FALLBACK_ERRNOS = {
+    errno.EXDEV, errno.ENOSYS, errno.EOPNOTSUPP, errno.EINVAL, errno.EPERM,
+}
+
+_clonefile_func = None
+
+
+def _clonefile(src: Path, dst: Path) -> bool:
+    """macOS: 通过 clonefile(2) 在 APFS 上创建写时复制副本，成功返回 True"""
+    global _clonefile_func
+    if _clonefile_func is None:
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            func = libc.clonefile
+            func.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+            func.restype = ctypes.c_int
+            _clonefile_func = func
+        except (OSError, AttributeError):
+            _clonefile_func = False
+    if not _clonefile_func:
+        return False
+    return _clonefile_func(os.fsencode(src), os.fsencode(dst), 0) == 0
+
+
+def _copy_file_range(src: Path, dst: Path) -> bool:
+    """
+    Linux: 通过 copy_file_range(2) 在内核中复制（支持 reflink），成功返回 True
+    
+    第一次调用就返回 0 时不能确定是否复制完成（procfs、部分 FUSE / overlay
+    文件会返回 0 而不复制），返回 False 交给后续方式处理。
+    """
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        copied = 0
+        while True:
+            try:
+                n = os.copy_file_range(src_fd, dst_fd, 1 << 30)
+            except OSError as e:
+                if copied == 0 and e.errno in _COPY_FALLBACK_ERRNOS:
+                    return False
+                raise
+            if n == 0:
+                return copied > 0
+            copied += n
+
+
+def _sendfile(src: Path, dst: Path) -> bool:
+    """
+    Linux: 通过 sendfile(2) 在内核中复制（不经过用户态缓冲区），成功返回 True
+    
+    按 st_size 复制；大小为 0（空文件或 procfs 等不报告大小的文件）或第一次
+    调用就返回 0 时返回 False，交给 shutil.copyfile 逐块读取。
+    以 'wb' 打开 dst 会先截断它，调用方（_fast_copy）须先排除 src 与 dst 为同一文件。
+    """
+    if not hasattr(os, 'sendfile'):
+        return False
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        src_fd, dst_fd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(src_fd).st_size
+        if size == 0:
+            return False
+        offset = 0
+        while offset < size:
+            try:
+                sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+            except OSError as e:
+                if offset == 0 and e.errno in _COPY_FALLBACK_ERRNOS:
+                    return False
+                raise
+            if sent == 0:
+                if offset == 0:
+                    return False
+                break
+            offset += sent
+        return True
+
+
+def _fast_copy(src: Path, dst: Path) -> None:
+    """
+    复制文件内容及元数据，尽量避免用户态的逐字节复制
+    
+    依次尝试 clonefile（macOS）、copy_file_range、sendfile（Linux），
+    均不可用时回退到 shutil.copyfile。
+    
+    Raises:
+        shutil.SameFileError: src 与 dst 是同一文件（在以 'wb' 打开 dst 截断源文件之前检查）
+    """
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"源文件与目标文件相同: {src}")
+    done = False
+    if sys.platform == 'darwin' and not dst.exists():
+        done = _clonefile(src, dst)
+    if not done and sys.platform.startswith('linux'):
+        done = _copy_file_range(src, dst) or _sendfile(src, dst)
+    if not done:
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+
+def _list_dir_names(directory: Path, files_only: bool = False) -> Set[str]:
+    """
+    一次 scandir 列出目录下的所有文件名，目录不可读时返回空集合
+    
+    files_only 为 True 时只保留（跟随符号链接后）是普通文件的项，失效的符号链接被排除。
+    """
+    try:
+        with os.scandir(directory) as entries:
+            if files_only:
+                return {entry.name for entry in entries if entry.is_file()}
+            return {entry.name for entry in entries}
+    except OSError:
+        return set()
+
+
+def _list_csv_files(directory: Path) -> List[Path]:
+    """一次 scandir 列出目录下的 CSV 文件（与 glob('*.csv') 一致，不含隐藏文件），按路径排序"""
+    try:
+        with os.scandir(directory) as entries:
+            return sorted(
+                directory / entry.name
+                for entry in entries
+                if entry.name.endswith('.csv') and not entry.name.startswith('.') and entry.is_file()
+            )
+    except OSError:
+        return []
+
+
+def _record_values(record: Record, headers: List[str]) -> List[Any]:
+    """按表头顺序取出记录的字段值，缺失的字段为空字符串"""
+    get = record.get
+    return [get(name, '') for name in headers]
+
+
+def _resolve_column(headers: Iterable[str], name: str) -> Optional[str]:
+    """在表头中查找字段名（支持大小写不同的字段名），未找到时返回 None"""
+    headers = set(headers)
+    if name in headers:
+        return name
+    lower = name.lower()
+    if lower in headers:
+        return lower
+    return None
+
+
+def _add_arrow_doi_links(table: 'pa.Table') -> 'pa.Table':
+    """在 pyarrow 表上向量化生成 DOI_Download_Link 列（规则同 generate_doi_url）"""
+    doi_column = _resolve_column(table.column_names, 'DOI')
+    if doi_column is None:
+        links = pa.array([''] * table.num_rows, type=pa.string())
+    else:
+        doi = pc.utf8_trim_whitespace(table[doi_column])
+        is_http = pc.or_(pc.starts_with(doi, 'http://'), pc.starts_with(doi, 'https://'))
+        url = pc.binary_join_element_wise(_DOI_BASE, doi, '')
+        links = pc.if_else(pc.equal(doi, ''), '', pc.if_else(is_http, doi, url))
+    
+    if 'DOI_Download_Link' in table.column_names:
+        index = table.column_names.index('DOI_Download_Link')
+        return table.set_column(index, 'DOI_Download_Link', links)
+    return table.append_column('DOI_Download_Link', links)
+
+
+def _arrow_rows(
+    table: 'pa.Table',
+    add_doi_link: bool = False
+) -> Tuple[List[str], List[Dict[str, str]], bool]:
+    """将 pyarrow 表转换为 (表头, 行列表, 是否已生成 DOI_Download_Link 列)"""
+    headers = list(table.column_names)
+    if add_doi_link and table.num_rows:
+        return headers, _add_arrow_doi_links(table).to_pylist(), True
+    return headers, table.to_pylist(), False
 
 
 class ResultExporter(ABC):
@@ -85,7 +322,12 @@ class ResultExporter(ABC):
 
 
 class CSVExporter(ResultExporter):
-    """CSV 格式导出器"""
+    """
+    CSV 格式导出器
+    
+    每条记录按表头顺序取出字段值（缺失的字段写为空字符串，与 csv.DictWriter 一致），
+    再用 csv.writer.writerows 一次写入，文件使用 1 MiB 写缓冲区。
+    """
     
     def __init__(
         self,
@@ -96,6 +338,20 @@ class CSVExporter(ResultExporter):
         super().__init__(output_dir, logger)
         self.encoding = encoding
     
+    def _write_csv(
+        self,
+        output_path: Path,
+        headers: List[str],
+        rows: Iterable[List[Any]]
+    ) -> None:
+        """写入 CSV 文件：先写表头，再一次写入所有行"""
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w', encoding=self.encoding, newline='',
+                  buffering=CSV_WRITE_BUFFER_SIZE) as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(rows)
+    
     def export_matched(
         self,
         result: BatchMatchResult,
@@ -108,20 +364,15 @@ class CSVExporter(ResultExporter):
             return None
         
         output_path = self.output_dir / "matched" / f"{result.source_name}_matched.csv"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        new_headers = headers + ['Matched_PDF_Path']
+        def rows():
+            for match_result in matched_results:
+                row = _record_values(match_result.record, headers)
+                row.append(str(match_result.matched_pdf))
+                yield row
         
         try:
-            with open(output_path, 'w', encoding=self.encoding, newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=new_headers)
-                writer.writeheader()
-                
-                for match_result in matched_results:
-                    row = match_result.record.to_dict()
-                    row['Matched_PDF_Path'] = str(match_result.matched_pdf)
-                    writer.writerow(row)
-            
+            self._write_csv(output_path, headers + ['Matched_PDF_Path'], rows())
             self.logger.info(f"保存匹配结果: {output_path} ({len(matched_results)} 条)")
             return output_path
             
@@ -141,20 +392,15 @@ class CSVExporter(ResultExporter):
             return None
         
         output_path = self.output_dir / "unmatched" / f"{result.source_name}_unmatched.csv"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        new_headers = headers + ['Unmatch_Reason']
+        def rows():
+            for match_result in unmatched_results:
+                row = _record_values(match_result.record, headers)
+                row.append(match_result.reason)
+                yield row
         
         try:
-            with open(output_path, 'w', encoding=self.encoding, newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=new_headers)
-                writer.writeheader()
-                
-                for match_result in unmatched_results:
-                    row = match_result.record.to_dict()
-                    row['Unmatch_Reason'] = match_result.reason
-                    writer.writerow(row)
-            
+            self._write_csv(output_path, headers + ['Unmatch_Reason'], rows())
             self.logger.info(f"保存未匹配结果: {output_path} ({len(unmatched_results)} 条)")
             return output_path
             
@@ -174,23 +420,18 @@ class CSVExporter(ResultExporter):
             return None
         
         output_path = self.output_dir / "multi_matched" / f"{result.source_name}_multi_matched.csv"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        new_headers = headers + ['Matched_PDF_Paths', 'Match_Count']
+        def rows():
+            for match_result in multi_results:
+                row = _record_values(match_result.record, headers)
+                row.append('; '.join(str(p) for p in match_result.matched_pdfs))
+                row.append(len(match_result.matched_pdfs))
+                yield row
         
         try:
-            with open(output_path, 'w', encoding=self.encoding, newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=new_headers)
-                writer.writeheader()
-                
-                for match_result in multi_results:
-                    row = match_result.record.to_dict()
-                    row['Matched_PDF_Paths'] = '; '.join(
-                        str(p) for p in match_result.matched_pdfs
-                    )
-                    row['Match_Count'] = len(match_result.matched_pdfs)
-                    writer.writerow(row)
-            
+            self._write_csv(
+                output_path, headers + ['Matched_PDF_Paths', 'Match_Count'], rows()
+            )
             self.logger.info(f"保存多重匹配结果: {output_path} ({len(multi_results)} 条)")
             return output_path
             
@@ -199,6 +440,140 @@ class CSVExporter(ResultExporter):
             raise
 
 
+class JSONLExporter(ResultExporter):
+    """
+    JSONL 格式导出器
+    
+    每行一个 JSON 对象，无需表头；安装 orjson 时使用其进行序列化。
+    
+    命令行与 SummaryGenerator 尚不支持 JSONL 输出（汇总只合并 *.csv），
+    因此未从包的 __all__ 导出。
+    """
+    
+    def _write_jsonl(
+        self,
+        output_path: Path,
+        rows: Iterable[Dict[str, Any]]
+    ) -> int:
+        """写入 JSONL 文件，返回写入行数"""
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        count = 0
+        with open(output_path, 'wb', buffering=JSONL_WRITE_BUFFER_SIZE) as f:
+            for row in rows:
+                f.write(_dumps_jsonl(row))
+                count += 1
+        return count
+    
+    def export_matched(
+        self,
+        result: BatchMatchResult,
+        headers: List[str],
+        field_mapping: FieldMapping
+    ) -> Optional[Path]:
+        """导出成功匹配的记录"""
+        matched_results = result.matched_results
+        if not matched_results:
+            return None
+        
+        output_path = self.output_dir / "matched" / f"{result.source_name}_matched.jsonl"
+        
+        def rows():
+            for match_result in matched_results:
+                yield match_result.record.to_dict_with(
+                    Matched_PDF_Path=str(match_result.matched_pdf)
+                )
+        
+        try:
+            count = self._write_jsonl(output_path, rows())
+            self.logger.info(f"保存匹配结果: {output_path} ({count} 条)")
+            return output_path
+            
+        except Exception as e:
+            self.logger.error(f"保存匹配 JSONL 时出错: {e}")
+            raise
+    
+    def export_unmatched(
+        self,
+        result: BatchMatchResult,
+        headers: List[str],
+        field_mapping: FieldMapping
+    ) -> Optional[Path]:
+        """导出未匹配的记录"""
+        unmatched_results = result.unmatched_results
+        if not unmatched_results:
+            return None
+        
+        output_path = self.output_dir / "unmatched" / f"{result.source_name}_unmatched.jsonl"
+        
+        def rows():
+            for match_result in unmatched_results:
+                yield match_result.record.to_dict_with(
+                    Unmatch_Reason=match_result.reason
+                )
+        
+        try:
+            count = self._write_jsonl(output_path, rows())
+            self.logger.info(f"保存未匹配结果: {output_path} ({count} 条)")
+            return output_path
+            
+        except Exception as e:
+            self.logger.error(f"保存未匹配 JSONL 时出错: {e}")
+            raise
+    
+    def export_multi_matched(
+        self,
+        result: BatchMatchResult,
+        headers: List[str],
+        field_mapping: FieldMapping
+    ) -> Optional[Path]:
+        """导出多重匹配的记录"""
+        multi_results = result.multi_matched_results
+        if not multi_results:
+            return None
+        
+        output_path = self.output_dir / "multi_matched" / f"{result.source_name}_multi_matched.jsonl"
+        
+        def rows():
+            for match_result in multi_results:
+                yield match_result.record.to_dict_with(
+                    Matched_PDF_Paths=[str(p) for p in match_result.matched_pdfs],
+                    Match_Count=len(match_result.matched_pdfs)
+                )
+        
+        try:
+            count = self._write_jsonl(output_path, rows())
+            self.logger.info(f"保存多重匹配结果: {output_path} ({count} 条)")
+            return output_path
+            
+        except Exception as e:
+            self.logger.error(f"保存多重匹配 JSONL 时出错: {e}")
+            raise
+
+
+def create_exporter(
+    export_format: str,
+    output_dir: Path,
+    **kwargs
+) -> ResultExporter:
+    """
+    导出器工厂函数
+    
+    Args:
+        export_format: 导出格式 ('csv' 或 'jsonl')
+        output_dir: 输出目录
+        **kwargs: 传递给具体导出器的参数
+        
+    Returns:
+        ResultExporter 实例
+    """
+    if export_format == 'csv':
+        return CSVExporter(output_dir, **kwargs)
+    elif export_format == 'jsonl':
+        return JSONLExporter(output_dir, **kwargs)
+    else:
+        raise ValueError(f"不支持的导出格式: {export_format}")
+
+
 class PDFCopier:
     """
     PDF 文件复制器
@@ -218,7 +593,8 @@ class PDFCopier:
         self,
         result: BatchMatchResult,
         uuid_field: str = '',
-        overwrite: bool = False
+        overwrite: bool = False,
+        max_workers: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         复制成功匹配的 PDF 文件
@@ -226,7 +602,9 @@ class PDFCopier:
         Args:
             result: 匹配结果
             uuid_field: UUID 字段名，如果提供则使用 uuid 作为新文件名
-            overwrite: 是否覆盖已存在的文件
+            overwrite: 是否覆盖已存在的文件；为 True 时多条记录写同一目标以最后一条为准，
+                否则只复制第一条、其余计为跳过
+            max_workers: 并发复制的线程数，默认 min(32, CPU 数 × 4)
             
         Returns:
             复制统计信息
@@ -248,9 +626,28 @@ class PDFCopier:
         self.logger.info(f"开始复制 PDF 文件到: {self.output_dir}")
         self.logger.info(f"待复制文件数: {stats['total']}")
         
+        # 每个目录只 scandir 一次，代替逐个文件的 exists() 调用；
+        # 输出目录列表中没有的名称再用一次 exists() 确认
+        # （不区分大小写的文件系统上，仅大小写不同的已有文件由此发现）
+        existing = set() if overwrite else _list_dir_names(self.output_dir)
+        src_dir_names: Dict[Path, Set[str]] = {}
+        
+        # 先确定每个文件的复制任务；写同一目标的任务归为一组，组内按记录顺序依次复制，
+        # 避免同一目标被多个线程同时写入（overwrite 时与逐条复制一样，最后一个来源生效）。
+        # 按 casefold 后的名称分组，不区分大小写的文件系统上仅大小写不同的目标也不会并发写入
+        tasks = []
+        groups: Dict[str, List[int]] = {}
+        claimed: Set[str] = set()
         for match_result in matched_results:
             src_path = match_result.matched_pdf
-            if not src_path or not src_path.exists():
+            if src_path:
+                names = src_dir_names.get(src_path.parent)
+                if names is None:
+                    names = src_dir_names[src_path.parent] = _list_dir_names(
+                        src_path.parent, files_only=True
+                    )
+            # 列表中没有时再单独确认一次（目录不可列出等情况）
+            if not src_path or (src_path.name not in names and not src_path.is_file()):
                 stats['failed'] += 1
                 stats['failed_files'].append((str(src_path), "源文件不存在"))
                 continue
@@ -273,22 +670,49 @@ class PDFCopier:
             
             dst_path = self.output_dir / dst_name
             
-            # 检查是否已存在
-            if dst_path.exists() and not overwrite:
+            # 不覆盖时检查是否已存在（包括本次运行中已分配的目标）
+            if not overwrite and (
+                dst_name in claimed or dst_name in existing or dst_path.exists()
+            ):
                 stats['skipped'] += 1
                 self.logger.debug(f"跳过已存在文件: {dst_name}")
                 continue
             
-            # 复制文件
-            try:
-                shutil.copy2(src_path, dst_path)
-                stats['copied'] += 1
-                stats['copied_files'].append(str(dst_path))
-                self.logger.debug(f"已复制: {src_path.name} -> {dst_name}")
-            except Exception as e:
-                stats['failed'] += 1
-                stats['failed_files'].append((str(src_path), str(e)))
-                self.logger.error(f"复制失败 {src_path.name}: {e}")
+            claimed.add(dst_name)
+            groups.setdefault(dst_name.casefold(), []).append(len(tasks))
+            tasks.append((src_path, dst_path))
+        
+        # 复制文件（I/O 密集，使用线程池并发执行）
+        if tasks:
+            errors: List[Optional[Exception]] = [None] * len(tasks)
+            
+            def copy_group(indices: List[int]) -> int:
+                for i in indices:
+                    try:
+                        _fast_copy(*tasks[i])
+                    except Exception as e:
+                        errors[i] = e
+                return len(indices)
+            
+            workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=min(workers, len(groups))) as executor:
+                futures = [executor.submit(copy_group, indices) for indices in groups.values()]
+                # 按完成顺序汇报进度，结果仍按提交顺序统计
+                done = 0
+                for future in as_completed(futures):
+                    previous, done = done, done + future.result()
+                    if done // COPY_PROGRESS_INTERVAL > previous // COPY_PROGRESS_INTERVAL:
+                        self.logger.info(f"复制进度: {done}/{len(tasks)}")
+            
+            for (src_path, dst_path), error in zip(tasks, errors):
+                if error is None:
+                    stats['copied'] += 1
+                    stats['copied_files'].append(str(dst_path))
+                    self.logger.debug(f"已复制: {src_path.name} -> {dst_path.name}")
+                else:
+                    stats['failed'] += 1
+                    stats['failed_files'].append((str(src_path), str(error)))
+                    self.logger.error(f"复制失败 {src_path.name}: {error}")
         
         self.logger.info(
             f"PDF 复制完成: 成功 {stats['copied']}, "
@@ -322,75 +746,173 @@ class CSVMerger:
         """
         合并目录下所有 CSV 文件
         
+        Args:
+            exclude_keys: 需要排除的键集合
+        
         Returns:
             合并的记录总数
         """
-        if exclude_keys is None:
-            exclude_keys = set()
+        count, _ = self._merge(
+            input_dir, output_path, add_source_column, add_doi_link,
+            deduplicate, dedup_key, exclude_keys, collect_key_column=None
+        )
+        return count
+    
+    def merge_collecting_keys(
+        self,
+        input_dir: Path,
+        output_path: Path,
+        key_column: str = 'DOI',
+        add_source_column: bool = True,
+        add_doi_link: bool = False,
+        deduplicate: bool = False,
+        dedup_key: str = 'DOI',
+        exclude_keys: Optional[Set[str]] = None
+    ) -> Tuple[int, Set[str]]:
+        """
+        合并目录下所有 CSV 文件，并在写入的同时收集 key_column 列的非空值
+        
+        与 merge() 后再调用 collect_matched_keys() 结果相同，但不需要重新读取输出文件。
+        
+        Returns:
+            (合并的记录总数, 键集合)
+        """
+        return self._merge(
+            input_dir, output_path, add_source_column, add_doi_link,
+            deduplicate, dedup_key, exclude_keys, collect_key_column=key_column
+        )
+    
+    def _merge(
+        self,
+        input_dir: Path,
+        output_path: Path,
+        add_source_column: bool,
+        add_doi_link: bool,
+        deduplicate: bool,
+        dedup_key: str,
+        exclude_keys: Optional[Set[str]],
+        collect_key_column: Optional[str]
+    ) -> Tuple[int, Set[str]]:
+        """merge 与 merge_collecting_keys 的实现，返回 (记录总数, 收集到的键集合)"""
+        # 只保存键的 64 位哈希值，避免大量长字符串占用内存
+        exclude_hashes = {_key_hash(k) for k in exclude_keys} if exclude_keys else set()
         
-        all_records = []
-        all_headers = None
-        seen_keys = set()
+        all_headers: Optional[List[str]] = None
+        seen_keys: Set[int] = set()
+        collected_keys: Set[str] = set()
         
-        csv_files = sorted(input_dir.glob("*.csv"))
+        csv_files = _list_csv_files(input_dir)
         
-        for csv_file in csv_files:
-            try:
-                with open(csv_file, 'r', encoding=self.encoding) as f:
-                    reader = csv.DictReader(f)
-                    headers = list(reader.fieldnames or [])
-                    
-                    source_name = csv_file.stem.split('_')[0]
-                    
-                    for row in reader:
-                        # 支持大小写不同的字段名
-                        key = row.get(dedup_key, '') or row.get(dedup_key.lower(), '')
+        def iter_rows() -> Iterator[Dict[str, str]]:
+            """逐行产出需要写入的记录，表头取自第一个可读取的文件"""
+            nonlocal all_headers
+            for csv_file in csv_files:
+                try:
+                    with self._open_rows(csv_file, add_doi_link) as (headers, rows, links_ready):
+                        source_name = csv_file.stem.split('_')[0]
                         
-                        if key in exclude_keys:
-                            continue
+                        # 每个文件只解析一次实际使用的字段名
+                        key_column = _resolve_column(headers, dedup_key)
+                        doi_column = _resolve_column(headers, 'DOI')
+                        collect_column = (
+                            _resolve_column(headers, collect_key_column)
+                            if collect_key_column else None
+                        )
                         
-                        if deduplicate:
-                            if key in seen_keys:
-                                continue
-                            seen_keys.add(key)
+                        if all_headers is None:
+                            all_headers = list(headers)
+                            if add_source_column:
+                                all_headers.insert(0, 'Source')
+                            if add_doi_link:
+                                all_headers.append('DOI_Download_Link')
                         
-                        if add_source_column:
-                            row['Source'] = source_name
-                        
-                        if add_doi_link:
-                            doi = row.get('DOI', '') or row.get('doi', '')
-                            row['DOI_Download_Link'] = generate_doi_url(doi)
-                        
-                        all_records.append(row)
-                    
-                    if all_headers is None:
-                        all_headers = list(headers)
-                        if add_source_column:
-                            all_headers.insert(0, 'Source')
-                        if add_doi_link:
-                            all_headers.append('DOI_Download_Link')
+                        for row in rows:
+                            # 短行中缺失的列为 None，与空字符串同样处理
+                            key = (row.get(key_column) or '') if key_column else ''
+                            key_hash = _key_hash(key)
+                            if key_hash in exclude_hashes:
+                                continue
                             
-            except Exception as e:
-                self.logger.warning(f"读取 {csv_file} 失败: {e}")
-        
-        if not all_records:
-            self.logger.warning("没有找到任何记录可合并")
-            return 0
+                            if deduplicate:
+                                if key_hash in seen_keys:
+                                    continue
+                                seen_keys.add(key_hash)
+                            
+                            # 通过过滤后才为 csv.reader 的行构造 dict
+                            if row.__class__ is RowView:
+                                row = row.to_dict()
+                            
+                            if collect_column:
+                                value = row.get(collect_column, '')
+                                if value:
+                                    collected_keys.add(value)
+                            
+                            if add_source_column:
+                                row['Source'] = source_name
+                            
+                            if add_doi_link and not links_ready:
+                                doi = row.get(doi_column, '') if doi_column else ''
+                                row['DOI_Download_Link'] = generate_doi_url(doi)
+                            
+                            yield row
+                            
+                except Exception as e:
+                    self.logger.warning(f"读取 {csv_file} 失败: {e}")
         
+        # 边读边写，内存占用与记录总数无关；有记录时才创建输出文件
+        count = 0
+        out_file = None
         try:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            with open(output_path, 'w', encoding=self.encoding, newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=all_headers, extrasaction='ignore')
-                writer.writeheader()
-                writer.writerows(all_records)
+            for row in iter_rows():
+                if out_file is None:
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    out_file = open(output_path, 'w', encoding=self.encoding, newline='',
+                                    buffering=CSV_WRITE_BUFFER_SIZE)
+                    writer = csv.DictWriter(out_file, fieldnames=all_headers, extrasaction='ignore')
+                    writer.writeheader()
+                writer.writerow(row)
+                count += 1
             
-            self.logger.info(f"合并完成: {output_path} ({len(all_records)} 条记录)")
-            return len(all_records)
+            if out_file is not None:
+                out_file.close()
             
         except Exception as e:
             self.logger.error(f"保存合并 CSV 时出错: {e}")
-            return 0
+            if out_file is not None:
+                out_file.close()
+                output_path.unlink(missing_ok=True)
+            collected_keys.clear()
+            return 0, collected_keys
+        
+        if count == 0:
+            self.logger.warning("没有找到任何记录可合并")
+            return 0, collected_keys
+        
+        self.logger.info(f"合并完成: {output_path} ({count} 条记录)")
+        return count, collected_keys
+    
+    @contextmanager
+    def _open_rows(
+        self,
+        csv_file: Path,
+        add_doi_link: bool = False
+    ) -> Iterator[Tuple[List[str], Iterable[Union[Dict[str, str], RowView]], bool]]:
+        """
+        打开 CSV 文件并返回 (表头, 行迭代器, 是否已生成 DOI_Download_Link 列)
+        
+        pyarrow 可用时整文件批量解析（DOI 链接列向量化生成），
+        否则使用 csv.reader 逐行读取：行以复用的 RowView 产出，
+        需要保留时调用 to_dict()。
+        """
+        table = read_csv_arrow(csv_file, self.encoding)
+        if table is not None:
+            yield _arrow_rows(table, add_doi_link)
+            return
+        
+        with open(csv_file, 'r', encoding=self.encoding, newline='',
+                  buffering=CSV_READ_BUFFER_SIZE) as f:
+            headers, views = read_row_views(f)
+            yield headers, views, False
     
     def collect_matched_keys(
         self,
@@ -404,13 +926,14 @@ class CSVMerger:
             return keys
         
         try:
-            with open(matched_csv_path, 'r', encoding=self.encoding) as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # 支持大小写不同的字段名
-                    key = row.get(key_column, '') or row.get(key_column.lower(), '')
-                    if key:
-                        keys.add(key)
+            with self._open_rows(matched_csv_path) as (headers, rows, _):
+                # 支持大小写不同的字段名
+                column = _resolve_column(headers, key_column)
+                if column:
+                    for row in rows:
+                        key = row.get(column, '')
+                        if key:
+                            keys.add(key)
             
             self.logger.info(f"从 {matched_csv_path} 收集到 {len(keys)} 个键值")
             
@@ -444,9 +967,11 @@ class SummaryGenerator:
         matched_dois = set()
         if matched_dir.exists():
             all_matched_path = self.output_dir / "ALL_MATCHED.csv"
-            matched_count = self.merger.merge(
+            # 合并时顺带收集 DOI，无需再读取一遍 ALL_MATCHED.csv
+            matched_count, matched_dois = self.merger.merge_collecting_keys(
                 input_dir=matched_dir,
                 output_path=all_matched_path,
+                key_column='DOI',
                 add_source_column=True,
                 add_doi_link=False
             )
@@ -454,7 +979,7 @@ class SummaryGenerator:
             
             if matched_count > 0:
                 self.logger.info(f"✅ 已合并匹配记录: {all_matched_path}")
-                matched_dois = self.merger.collect_matched_keys(all_matched_path)
+                self.logger.info(f"从 {all_matched_path} 收集到 {len(matched_dois)} 个键值")
         
         # 合并未匹配的记录
         if unmatched_dir.exists():
@@ -474,7 +999,7 @@ class SummaryGenerator:
                 self.logger.info(f"❌ 已合并未匹配记录: {all_unmatched_path}")
         
         # 合并多重匹配的记录
-        if multi_matched_dir.exists() and list(multi_matched_dir.glob("*.csv")):
+        if _list_csv_files(multi_matched_dir):
             all_multi_path = self.output_dir / "ALL_MULTI_MATCHED.csv"
             multi_count = self.merger.merge(
                 input_dir=multi_matched_dir,
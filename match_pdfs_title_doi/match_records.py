@@ -19,8 +19,12 @@ Version: 3.0.0
 """
 
 import argparse
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -36,8 +40,30 @@ from exporters import CSVExporter, PDFCopier, SummaryGenerator
 from matcher import BatchMatchResult, PDFMatcher
 
 
+# 后台写日志的监听线程（setup_logging 重复调用时先停止旧的）
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _stop_log_listener():
+    """停止日志监听线程，写出队列中剩余的日志"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
+
+
 def setup_logging(log_dir: Path) -> logging.Logger:
-    """设置日志记录器"""
+    """
+    设置日志记录器
+    
+    记录器只挂一个 QueueHandler，文件和控制台的实际写入由后台
+    QueueListener 线程完成，匹配循环中的日志调用不再直接做磁盘 I/O；
+    进程退出时通过 atexit 停止监听线程并写完剩余日志。
+    """
+    global _log_listener
+    _stop_log_listener()
     log_dir.mkdir(parents=True, exist_ok=True)
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -60,12 +86,20 @@ def setup_logging(log_dir: Path) -> logging.Logger:
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
     
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    log_queue = queue.SimpleQueue()
+    _log_listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _log_listener.start()
+    
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
     
     return logger
 
 
+atexit.register(_stop_log_listener)
+
+
 class MatchingApplication:
     """
     文献匹配应用程序主类 (简化版)
@@ -80,6 +114,8 @@ class MatchingApplication:
         copy_dir: Optional[Path] = None,
         recursive_scan: bool = True,
         clean_results: bool = False,
+        fuzzy_threshold: Optional[float] = None,
+        copy_workers: Optional[int] = None,
     ):
         """
         初始化应用程序
@@ -92,6 +128,8 @@ class MatchingApplication:
             copy_dir: PDF 复制目标目录
             recursive_scan: 是否递归扫描子目录中的 PDF
             clean_results: 是否在运行前清空历史结果
+            fuzzy_threshold: Title 模糊匹配阈值（0~1），为 None 时不做模糊匹配
+            copy_workers: 并发复制 PDF 的线程数，为 None 时自动确定
         """
         self.pdfs_dir = Path(pdfs_dir)
         self.output_dir = Path(output_dir)
@@ -100,6 +138,8 @@ class MatchingApplication:
         self.copy_dir = Path(copy_dir) if copy_dir else None
         self.recursive_scan = recursive_scan
         self.clean_results = clean_results
+        self.fuzzy_threshold = fuzzy_threshold
+        self.copy_workers = copy_workers
         
         # 清空历史结果
         if self.clean_results:
@@ -163,7 +203,8 @@ class MatchingApplication:
         matcher = PDFMatcher(
             logger=self.logger,
             title_column=CSV_FIELD_MAPPING.title,
-            doi_column=CSV_FIELD_MAPPING.doi
+            doi_column=CSV_FIELD_MAPPING.doi,
+            fuzzy_threshold=self.fuzzy_threshold
         )
         
         return self._run_matching(data_source, matcher, CSV_FIELD_MAPPING)
@@ -174,6 +215,8 @@ class MatchingApplication:
         database: str,
         collection: str,
         query: Optional[Dict] = None,
+        project_fields: bool = False,
+        ensure_indexes: bool = False,
     ) -> BatchMatchResult:
         """
         使用 MongoDB 数据源运行匹配
@@ -190,14 +233,17 @@ class MatchingApplication:
             database=database,
             collection=collection,
             field_mapping=MONGODB_FIELD_MAPPING,
-            logger=self.logger
+            logger=self.logger,
+            project_fields=project_fields,
+            ensure_indexes=ensure_indexes
         )
         
         # 创建匹配器
         matcher = PDFMatcher(
             logger=self.logger,
             title_column=MONGODB_FIELD_MAPPING.title,  # 'label'
-            doi_column=MONGODB_FIELD_MAPPING.doi       # 'doi'
+            doi_column=MONGODB_FIELD_MAPPING.doi,      # 'doi'
+            fuzzy_threshold=self.fuzzy_threshold
         )
         
         return self._run_matching(
@@ -218,6 +264,15 @@ class MatchingApplication:
         self.logger.info(f"PDF 目录: {self.pdfs_dir}")
         self.logger.info(f"输出目录: {self.output_dir}")
         
+        # 在后台扫描 PDF 目录，与连接、读取数据源同时进行
+        scan_executor = ThreadPoolExecutor(max_workers=1)
+        pdf_future = scan_executor.submit(
+            matcher.pdf_scanner.scan_paths,
+            self.pdfs_dir,
+            recursive=self.recursive_scan
+        )
+        scan_executor.shutdown(wait=False)
+        
         # 连接数据源
         if not data_source.connect():
             self.logger.error("无法连接到数据源")
@@ -233,7 +288,8 @@ class MatchingApplication:
                 pdfs_dir=self.pdfs_dir,
                 data_result=data_result,
                 interactive=False,
-                recursive_scan=self.recursive_scan
+                recursive_scan=self.recursive_scan,
+                pdf_files=pdf_future.result()
             )
             
             # 导出结果
@@ -258,7 +314,8 @@ class MatchingApplication:
                 copier = PDFCopier(self.copy_dir, logger=self.logger)
                 copy_stats = copier.copy_matched_pdfs(
                     self.result,
-                    uuid_field=field_mapping.uuid if field_mapping.uuid else ''
+                    uuid_field=field_mapping.uuid if field_mapping.uuid else '',
+                    max_workers=self.copy_workers
                 )
                 
                 self.logger.info(
@@ -356,6 +413,16 @@ def create_argument_parser() -> argparse.ArgumentParser:
         type=str,
         help='MongoDB 集合名称'
     )
+    mongo_group.add_argument(
+        '--mongo-project-fields',
+        action='store_true',
+        help='只读取 label/doi/uuid 字段（默认读取完整文档）'
+    )
+    mongo_group.add_argument(
+        '--mongo-ensure-indexes',
+        action='store_true',
+        help='连接后为 label/doi/uuid 字段创建索引（需要建索引权限）'
+    )
     
     # 输出参数
     output_group = parser.add_argument_group('输出参数')
@@ -386,6 +453,15 @@ def create_argument_parser() -> argparse.ArgumentParser:
         help='不递归扫描子目录'
     )
     
+    # 匹配参数
+    match_group = parser.add_argument_group('匹配参数')
+    match_group.add_argument(
+        '--fuzzy-threshold',
+        type=fuzzy_threshold_arg,
+        default=None,
+        help='精确匹配失败时按 Title 相似度模糊匹配的阈值 (0~1，如 0.9；需要 rapidfuzz 和 numpy，默认不启用)'
+    )
+    
     # PDF 复制参数
     copy_group = parser.add_argument_group('PDF 复制参数')
     copy_group.add_argument(
@@ -399,6 +475,12 @@ def create_argument_parser() -> argparse.ArgumentParser:
         default='./pdfs',
         help='PDF 复制目标目录 (默认: ./pdfs)'
     )
+    copy_group.add_argument(
+        '--copy-workers',
+        type=copy_workers_arg,
+        default=None,
+        help='并发复制 PDF 的线程数 (默认: min(32, CPU 数 × 4))'
+    )
     
     # 清理参数
     clean_group = parser.add_argument_group('清理参数')
@@ -411,6 +493,28 @@ def create_argument_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def fuzzy_threshold_arg(value: str) -> float:
+    """解析 --fuzzy-threshold，要求取值在 [0, 1] 之间"""
+    try:
+        threshold = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"不是有效的数值: {value}")
+    if not 0 <= threshold <= 1:
+        raise argparse.ArgumentTypeError(f"必须在 [0, 1] 之间: {value}")
+    return threshold
+
+
+def copy_workers_arg(value: str) -> int:
+    """解析 --copy-workers，要求为不小于 1 的整数"""
+    try:
+        workers = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"不是有效的整数: {value}")
+    if workers < 1:
+        raise argparse.ArgumentTypeError(f"必须不小于 1: {value}")
+    return workers
+
+
 def resolve_path(path_str: str, base_dir: Path) -> Path:
     """解析路径"""
     path = Path(path_str)
@@ -451,7 +555,9 @@ def main():
         copy_pdfs=args.copy_pdfs,
         copy_dir=copy_dir,
         recursive_scan=recursive_scan,
-        clean_results=args.clean
+        clean_results=args.clean,
+        fuzzy_threshold=args.fuzzy_threshold,
+        copy_workers=args.copy_workers
     )
     
     # 根据数据源类型运行
@@ -491,7 +597,9 @@ def main():
         app.run_mongodb(
             connection_string=args.mongo_uri,
             database=args.mongo_db,
-            collection=args.mongo_collection
+            collection=args.mongo_collection,
+            project_fields=args.mongo_project_fields,
+            ensure_indexes=args.mongo_ensure_indexes
         )
 
 
@@ -10,19 +10,44 @@ Author: GitHub Copilot
 Date: 2025-01-20
 """
 
+import functools
 import logging
+import os
 import re
+import sys
+from bisect import bisect_left, bisect_right
 from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 
 try:
     from .data_sources import DataSourceResult, Record
 except ImportError:
     from data_sources import DataSourceResult, Record
 
+try:
+    from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+except ImportError:  # rapidfuzz 为可选依赖，仅 Title 模糊匹配需要
+    rf_process = None
+
+try:
+    import numpy  # noqa: F401  rapidfuzz.process.cdist 需要 numpy，rapidfuzz 本身不依赖它
+except ImportError:
+    numpy = None
+
+
+# 递归扫描 PDF 目录时并发 scandir 的线程数
+SCAN_MAX_WORKERS = 8
+
+# Title 模糊匹配时每批计算相似度矩阵的记录数（限制矩阵内存占用）
+FUZZY_CHUNK_SIZE = 1024
+
+# 匹配记录时每处理多少条输出一次进度
+PROGRESS_INTERVAL = 1000
+
 
 class MatchStatus(Enum):
     """匹配状态"""
@@ -31,7 +56,7 @@ class MatchStatus(Enum):
     MULTI_MATCHED = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class MatchResult:
     """
     单条记录的匹配结果
@@ -58,39 +83,71 @@ class MatchResult:
         return None
 
 
-@dataclass
+@dataclass(slots=True)
 class BatchMatchResult:
     """
     批量匹配结果汇总
+    
+    各状态的计数只统计一次：match_all() 填充完 results 后调用 recount()，
+    之后 *_count、match_rate 和 to_stats_dict() 都直接读取保存的计数；
+    未调用过 recount() 时，首次访问计数会自动统计一次。
+    
+    results 是可直接修改的公开列表，计数不会随之更新：
+    在 match_all() 之外修改 results 后需调用 recount()。
+    按状态划分的 *_results 每次访问时遍历 results，始终反映当前内容。
     """
     source_name: str
     total_records: int
     total_pdfs: int
     results: List[MatchResult] = field(default_factory=list)
+    _counts: Optional[Dict[MatchStatus, int]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def _select(self, status: MatchStatus) -> List[MatchResult]:
+        """按原顺序返回指定状态的结果"""
+        return [r for r in self.results if r.status == status]
     
     @property
     def matched_results(self) -> List[MatchResult]:
-        return [r for r in self.results if r.status == MatchStatus.MATCHED]
+        return self._select(MatchStatus.MATCHED)
     
     @property
     def unmatched_results(self) -> List[MatchResult]:
-        return [r for r in self.results if r.status == MatchStatus.UNMATCHED]
+        return self._select(MatchStatus.UNMATCHED)
     
     @property
     def multi_matched_results(self) -> List[MatchResult]:
-        return [r for r in self.results if r.status == MatchStatus.MULTI_MATCHED]
+        return self._select(MatchStatus.MULTI_MATCHED)
+    
+    def recount(self) -> None:
+        """单次遍历 results，重新统计并保存各状态的记录数"""
+        counts = dict.fromkeys(MatchStatus, 0)
+        for match_result in self.results:
+            counts[match_result.status] += 1
+        self._counts = counts
+    
+    def _count(self, status: MatchStatus) -> int:
+        """读取保存的计数，尚未统计时先统计一次"""
+        if self._counts is None:
+            self.recount()
+        return self._counts[status]
+    
+    def status_counts(self) -> Dict[MatchStatus, int]:
+        """各状态的记录数"""
+        return {status: self._count(status) for status in MatchStatus}
     
     @property
     def matched_count(self) -> int:
-        return len(self.matched_results)
+        return self._count(MatchStatus.MATCHED)
     
     @property
     def unmatched_count(self) -> int:
-        return len(self.unmatched_results)
+        return self._count(MatchStatus.UNMATCHED)
     
     @property
     def multi_matched_count(self) -> int:
-        return len(self.multi_matched_results)
+        return self._count(MatchStatus.MULTI_MATCHED)
     
     @property
     def match_rate(self) -> float:
@@ -101,13 +158,164 @@ class BatchMatchResult:
     
     def to_stats_dict(self) -> Dict[str, int]:
         """转换为统计字典"""
+        counts = self.status_counts()
         return {
             'total_records': self.total_records,
             'total_pdfs': self.total_pdfs,
-            'matched': self.matched_count,
-            'unmatched': self.unmatched_count,
-            'multi_matched': self.multi_matched_count,
+            'matched': counts[MatchStatus.MATCHED],
+            'unmatched': counts[MatchStatus.UNMATCHED],
+            'multi_matched': counts[MatchStatus.MULTI_MATCHED],
+        }
+
+
+@dataclass
+class _KeyIndex:
+    """
+    标准化文本 -> PDF 列表的索引
+    
+    在记录循环开始前一次性整理出键的长度分组（长度升序），匹配时用二分查找
+    确定可能命中的长度范围，再按这些长度截取记录文本做哈希探测，
+    代替逐个比较所有键；多个键命中时按键的插入顺序返回。
+    
+    前缀探测只需考虑首字符与 text 相同的键，因此另按首字符记录各自的长度列表，
+    只截取这些长度。
+    """
+    entries: Dict[str, List[int]]
+    lengths: List[int] = field(init=False)
+    keys_by_length: Dict[int, List[str]] = field(init=False)
+    lengths_by_first_char: Dict[str, List[int]] = field(init=False)
+    rank: Dict[str, int] = field(init=False)
+    
+    def __post_init__(self):
+        keys_by_length: Dict[int, List[str]] = defaultdict(list)
+        for key in self.entries:
+            if key:
+                keys_by_length[len(key)].append(key)
+        self.keys_by_length = dict(keys_by_length)
+        self.lengths = sorted(keys_by_length)
+        
+        lengths_by_first_char: Dict[str, set] = defaultdict(set)
+        for key in self.entries:
+            if key:
+                lengths_by_first_char[key[0]].add(len(key))
+        self.lengths_by_first_char = {
+            char: sorted(lengths) for char, lengths in lengths_by_first_char.items()
         }
+        self.rank = {key: i for i, key in enumerate(self.entries)}
+    
+    def _ordered(self, keys: List[str]) -> List[str]:
+        if len(keys) > 1:
+            keys.sort(key=self.rank.__getitem__)
+        return keys
+    
+    def prefix_matches(self, text: str) -> List[str]:
+        """返回是 text 前缀的所有键"""
+        lengths = self.lengths_by_first_char.get(text[:1])
+        if not lengths:
+            return []
+        entries = self.entries
+        keys = []
+        for length in lengths[:bisect_right(lengths, len(text))]:
+            if text[:length] in entries:
+                keys.append(text[:length])
+        return self._ordered(keys)
+    
+    def substring_matches(self, text: str, min_length: int = 1) -> List[str]:
+        """返回长度不小于 min_length 且包含在 text 中的所有键"""
+        entries = self.entries
+        keys_by_length = self.keys_by_length
+        n = len(text)
+        all_lengths = self.lengths
+        lengths = all_lengths[bisect_left(all_lengths, min_length):bisect_right(all_lengths, n)]
+        
+        # 候选键少于探测次数时（PDF 很少），直接逐个比较更快
+        probes = sum(n - length + 1 for length in lengths)
+        if sum(len(keys_by_length[length]) for length in lengths) < probes:
+            keys = [key for length in lengths for key in keys_by_length[length] if key in text]
+            return self._ordered(keys)
+        
+        keys = []
+        for length in lengths:
+            found = {text[i:i + length] for i in range(n - length + 1)}
+            keys.extend(key for key in found if key in entries)
+        return self._ordered(keys)
+
+
+# _match_batch 返回的匹配方式
+_MATCH_NONE = 0
+_MATCH_DOI = 1
+_MATCH_TITLE = 2
+_MATCH_METHOD_NAMES = {_MATCH_DOI: "DOI", _MATCH_TITLE: "Title"}
+
+
+def _match_batch(
+    norm_titles: List[str],
+    norm_dois: List[str],
+    title_index: _KeyIndex,
+    doi_index: _KeyIndex
+) -> List[Tuple[int, List[int]]]:
+    """
+    批量匹配记录的内层循环
+    
+    输入为逐条记录标准化后的 Title / DOI（不参与匹配时为空字符串），
+    索引的值为 PDF 编号；只使用 str、list、dict 和整数，不涉及 Record、Path
+    或日志，结果由调用方统一转换为 MatchResult。
+    
+    Returns:
+        与输入一一对应的 (匹配方式, [PDF 编号]) 列表，编号按命中顺序去重
+    """
+    doi_entries = doi_index.entries
+    title_entries = title_index.entries
+    substring_matches = doi_index.substring_matches
+    prefix_matches = title_index.prefix_matches
+    
+    results: List[Tuple[int, List[int]]] = []
+    append = results.append
+    for norm_title, norm_doi in zip(norm_titles, norm_dois):
+        # 以 dict 作有序集合累积匹配的 PDF（同一个 PDF 可能出现在多个索引键下）
+        matched: Dict[int, None] = {}
+        method = _MATCH_NONE
+        
+        # 1. 优先尝试 DOI 匹配：PDF 的 DOI 包含在记录的 DOI 中（而非反过来），
+        # 收集所有包含在记录 DOI 中的键（后缀和中间的子串都算）
+        if norm_doi:
+            for key in substring_matches(norm_doi, 5):
+                matched.update(dict.fromkeys(doi_entries[key]))
+            if matched:
+                method = _MATCH_DOI
+        
+        # 2. 如果 DOI 未匹配到，尝试 Title 匹配：记录标题以 PDF 文件名开头
+        if not matched and norm_title:
+            for key in prefix_matches(norm_title):
+                matched.update(dict.fromkeys(title_entries[key]))
+            if matched:
+                method = _MATCH_TITLE
+        
+        append((method, list(matched)))
+    return results
+
+
+# 文件名中的特殊编码（如 #x3a; #x3f;）
+_SPECIAL_ENCODING_RE = re.compile(r'#x[0-9a-fA-F]+;')
+
+# 批量处理时拼接文件名用的分隔符（ASCII 单元分隔符，正常文件名中不会出现）
+_BATCH_SEPARATOR = '\x1f'
+
+
+def _ascii_delete_table(keep: str, fold_case: bool = False) -> List[Optional[str]]:
+    """
+    构造删除 keep 之外所有 ASCII 字符的 str.translate 表
+    
+    用按码位下标的列表而不是 str.maketrans 的字典，translate 查表更快；
+    码位 >= 128 的字符查表越界，translate 会原样保留。
+    fold_case 为 True 时同时把 ASCII 大写字母映射为 keep 中对应的小写字母。
+    """
+    table: List[Optional[str]] = [None] * 128
+    for c in keep:
+        table[ord(c)] = c
+        if fold_case and c.isalpha():
+            table[ord(c.upper())] = c
+    return table
 
 
 class TextNormalizer:
@@ -115,10 +323,27 @@ class TextNormalizer:
     文本标准化工具类
     """
     
+    # str.translate 删除表：只保留小写字母（及数字），非 ASCII 字符另行移除
+    _KEEP_ALPHA = _ascii_delete_table('abcdefghijklmnopqrstuvwxyz')
+    _KEEP_ALNUM = _ascii_delete_table('abcdefghijklmnopqrstuvwxyz0123456789')
+    # 纯 ASCII 文本用的表：同时完成小写化，一次 translate 即可
+    _FOLD_ALPHA = _ascii_delete_table('abcdefghijklmnopqrstuvwxyz', fold_case=True)
+    _FOLD_ALNUM = _ascii_delete_table('abcdefghijklmnopqrstuvwxyz0123456789', fold_case=True)
+    # normalize_batch 用的表：在上面四张表的基础上保留分隔符
+    _BATCH_KEEP_ALPHA = _ascii_delete_table('abcdefghijklmnopqrstuvwxyz' + _BATCH_SEPARATOR)
+    _BATCH_KEEP_ALNUM = _ascii_delete_table('abcdefghijklmnopqrstuvwxyz0123456789' + _BATCH_SEPARATOR)
+    _BATCH_FOLD_ALPHA = _ascii_delete_table(
+        'abcdefghijklmnopqrstuvwxyz' + _BATCH_SEPARATOR, fold_case=True
+    )
+    _BATCH_FOLD_ALNUM = _ascii_delete_table(
+        'abcdefghijklmnopqrstuvwxyz0123456789' + _BATCH_SEPARATOR, fold_case=True
+    )
+    
     @staticmethod
+    @functools.lru_cache(maxsize=131072)
     def normalize(text: str, remove_numbers: bool = True) -> str:
         """
-        标准化文本用于匹配
+        标准化文本用于匹配（结果按 (text, remove_numbers) 缓存，重复的标题/DOI 直接命中）
         
         Args:
             text: 原始文本
@@ -130,12 +355,52 @@ class TextNormalizer:
         if not text:
             return ""
         
-        text = text.lower()
+        # 纯 ASCII 文本（绝大多数文件名和 DOI）只需一次 translate
+        if text.isascii():
+            table = TextNormalizer._FOLD_ALPHA if remove_numbers else TextNormalizer._FOLD_ALNUM
+            return text.translate(table)
+        
+        # 非 ASCII 字符小写化后可能变为 ASCII 字母（如开尔文符号 K），须先 lower()
+        table = TextNormalizer._KEEP_ALPHA if remove_numbers else TextNormalizer._KEEP_ALNUM
+        text = text.lower().translate(table)
+        
+        # 删除表只覆盖 ASCII，剩余的非 ASCII 字符整体丢弃
+        if not text.isascii():
+            text = text.encode('ascii', 'ignore').decode('ascii')
+        return text
+    
+    @staticmethod
+    def normalize_batch(texts: List[str], remove_numbers: bool = True) -> List[str]:
+        """
+        批量标准化文本，结果与逐个调用 normalize 相同
+        
+        用分隔符拼接后对整个字符串只做一次 translate（必要时一次 lower 和
+        ASCII 过滤）再拆分，省去逐条调用的开销；分隔符在删除表中保留。
+        文本本身含分隔符时回退为逐个 normalize。
         
-        if remove_numbers:
-            return re.sub(r'[^a-z]', '', text)
+        逐字符的过滤全部在 str.translate 的 C 循环中完成，耗时主要在拼接和拆分上。
+        """
+        if not texts:
+            return []
+        joined = _BATCH_SEPARATOR.join(texts)
+        if joined.isascii():
+            joined = joined.translate(
+                TextNormalizer._BATCH_FOLD_ALPHA if remove_numbers
+                else TextNormalizer._BATCH_FOLD_ALNUM
+            )
         else:
-            return re.sub(r'[^a-z0-9]', '', text)
+            joined = joined.lower().translate(
+                TextNormalizer._BATCH_KEEP_ALPHA if remove_numbers
+                else TextNormalizer._BATCH_KEEP_ALNUM
+            )
+            if not joined.isascii():
+                joined = joined.encode('ascii', 'ignore').decode('ascii')
+        
+        normalized = joined.split(_BATCH_SEPARATOR)
+        if len(normalized) != len(texts):
+            normalize = TextNormalizer.normalize
+            return [normalize(text, remove_numbers) for text in texts]
+        return normalized
     
     @staticmethod
     def remove_special_encoding(filename: str) -> str:
@@ -144,7 +409,23 @@ class TextNormalizer:
         
         编码格式: #x 后紧跟十六进制字符，以 ; 结尾
         """
-        return re.sub(r'#x[0-9a-fA-F]+;', '', filename)
+        return _SPECIAL_ENCODING_RE.sub('', filename)
+    
+    @staticmethod
+    def remove_special_encoding_batch(filenames: List[str]) -> List[str]:
+        """
+        批量移除特殊编码，结果与逐个调用 remove_special_encoding 相同
+        
+        用分隔符把所有文件名拼接成一个字符串，只做一次 sub 再拆分；
+        编码模式不会跨越分隔符。文件名本身含分隔符时拆分数量对不上，回退为逐个处理。
+        """
+        if not filenames:
+            return []
+        joined = _SPECIAL_ENCODING_RE.sub('', _BATCH_SEPARATOR.join(filenames))
+        cleaned = joined.split(_BATCH_SEPARATOR)
+        if len(cleaned) != len(filenames):
+            return [_SPECIAL_ENCODING_RE.sub('', name) for name in filenames]
+        return cleaned
 
 
 class PDFNameAnalyzer:
@@ -161,10 +442,18 @@ class PDFNameAnalyzer:
         '10.',            # 标准 DOI
     ]
     
+    # 文件名中的年份：_2024_期刊名 或以 _2024 结尾
+    _YEAR_RE = re.compile(r'_(\d{4})(?:_|$)')
+    
+    # DOI 前缀可能的首字符（含大写形式）
+    _DOI_FIRST_CHARS = frozenset(
+        c for prefix in DOI_PREFIXES for c in (prefix[0], prefix[0].upper())
+    )
+    
     @classmethod
     def analyze(cls, pdf_name: str) -> Tuple[str, str, bool]:
         """
-        分析 PDF 文件名，返回用于匹配的文本
+        分析 PDF 文件名，返回用于匹配的文本（结果按移除特殊编码后的文件名缓存）
         
         Args:
             pdf_name: PDF 文件名（不含扩展名）
@@ -175,10 +464,18 @@ class PDFNameAnalyzer:
             - normalized_for_doi: 用于 DOI 匹配的标准化文本
             - is_doi_format: 是否为 DOI 格式的文件名
         """
-        # 1. 先移除特殊编码
-        cleaned_name = TextNormalizer.remove_special_encoding(pdf_name)
+        return cls._analyze_cleaned(TextNormalizer.remove_special_encoding(pdf_name))
+    
+    @classmethod
+    @functools.lru_cache(maxsize=65536)
+    def _analyze_cleaned(cls, cleaned_name: str) -> Tuple[str, str, bool]:
+        """
+        analyze 的主体，输入为已移除特殊编码的文件名
         
-        # 2. 检查是否为 DOI 格式
+        _build_indexes 直接调用它，结果按 cleaned_name 缓存，
+        重复扫描同一目录时每个文件名只需一次字典查找。
+        """
+        # 检查是否为 DOI 格式
         is_doi = cls._is_doi_format(cleaned_name)
         
         if is_doi:
@@ -199,11 +496,10 @@ class PDFNameAnalyzer:
     @classmethod
     def _is_doi_format(cls, name: str) -> bool:
         """检查是否为 DOI 格式的文件名"""
-        name_lower = name.lower()
-        for prefix in cls.DOI_PREFIXES:
-            if name_lower.startswith(prefix):
-                return True
-        return False
+        # 先比较首字符，非 DOI 文件名无需小写化整个字符串
+        if name[:1] not in cls._DOI_FIRST_CHARS:
+            return False
+        return name.lower().startswith(tuple(cls.DOI_PREFIXES))
     
     @classmethod
     def _build_full_doi(cls, name: str) -> str:
@@ -223,13 +519,8 @@ class PDFNameAnalyzer:
         
         自动检测是否包含年份模式（如 _2024_期刊名）
         """
-        # 查找 _年份_ 模式（4位数字前后有下划线）
-        match = re.search(r'_(\d{4})_', name)
-        if match:
-            return name[:match.start()]
-        
-        # 查找 _年份 结尾模式
-        match = re.search(r'_(\d{4})$', name)
+        # 查找 _年份_ 或 _年份 结尾模式（两者的最左匹配与依次查找的结果相同）
+        match = cls._YEAR_RE.search(name)
         if match:
             return name[:match.start()]
         
@@ -237,6 +528,12 @@ class PDFNameAnalyzer:
         return name
 
 
+def clear_caches() -> None:
+    """清空 TextNormalizer.normalize 与 PDFNameAnalyzer 文件名分析的结果缓存"""
+    TextNormalizer.normalize.cache_clear()
+    PDFNameAnalyzer._analyze_cleaned.cache_clear()
+
+
 class PDFScanner:
     """
     PDF 文件扫描器
@@ -245,16 +542,40 @@ class PDFScanner:
     def __init__(self, logger: Optional[logging.Logger] = None):
         self.logger = logger or logging.getLogger(__name__)
     
-    def scan_directory(self, directory: Path, recursive: bool = False) -> Dict[str, Path]:
+    def scan_directory(
+        self,
+        directory: Path,
+        recursive: bool = False,
+        max_workers: int = SCAN_MAX_WORKERS
+    ) -> Dict[str, Path]:
         """
         扫描目录获取所有 PDF 文件
         
+        参数与 scan_paths 相同，返回值中的路径为 Path 对象。
+        """
+        paths = self.scan_paths(directory, recursive, max_workers)
+        return {stem: Path(path) for stem, path in paths.items()}
+    
+    def scan_paths(
+        self,
+        directory: Path,
+        recursive: bool = False,
+        max_workers: int = SCAN_MAX_WORKERS
+    ) -> Dict[str, str]:
+        """
+        扫描目录获取所有 PDF 文件，路径保持为字符串
+        
+        匹配过程只需要文件名，不为每个 PDF 构造 Path 对象。
+        使用 os.scandir 直接读取目录项类型，递归时用线程池并发扫描子目录；
+        结果按深度优先顺序合并，与 Path.glob('**/*.pdf') 的顺序一致。
+        
         Args:
             directory: 要扫描的目录
-            recursive: 是否递归扫描子目录
+            recursive: 是否递归扫描子目录（不进入符号链接目录）
+            max_workers: 递归扫描时的线程数（<= 1 时在当前线程中扫描）
             
         Returns:
-            {文件名（不含扩展名）: 完整路径} 的字典
+            {文件名（不含扩展名）: 完整路径字符串} 的字典
         """
         pdf_files = {}
         
@@ -262,15 +583,86 @@ class PDFScanner:
             self.logger.warning(f"目录不存在: {directory}")
             return pdf_files
         
+        root = str(directory)
         try:
-            pattern = '**/*.pdf' if recursive else '*.pdf'
-            for item in directory.glob(pattern):
-                if item.is_file():
-                    pdf_files[item.stem] = item
+            if recursive:
+                scanned = self._scan_tree(root, max_workers)
+            else:
+                scanned = {root: self._scan_one(root, recursive=False)}
         except Exception as e:
             self.logger.error(f"扫描目录 {directory} 时出错: {e}")
+            return pdf_files
+        
+        # 深度优先合并（同名文件以后扫描到的为准）
+        stack = [root]
+        while stack:
+            pdfs, subdirs = scanned[stack.pop()]
+            pdf_files.update(pdfs)
+            stack.extend(reversed(subdirs))
         
         return pdf_files
+    
+    @staticmethod
+    def _scan_one(
+        directory: str,
+        recursive: bool = True
+    ) -> Tuple[List[Tuple[str, str]], List[str]]:
+        """扫描单个目录，返回 ([(stem, path)], [子目录])"""
+        pdfs = []
+        subdirs = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if recursive and entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif name[-4:].lower() == '.pdf' and entry.is_file():
+                    pdfs.append((name[:-4], entry.path))
+        return pdfs, subdirs
+    
+    def _scan_tree(
+        self,
+        root: str,
+        max_workers: int
+    ) -> Dict[str, Tuple[List[Tuple[str, str]], List[str]]]:
+        """
+        用线程池并发扫描目录树，子目录一经发现立即提交
+        
+        max_workers <= 1 时在当前线程中用显式栈逐个扫描，省去线程池开销。
+        """
+        scanned = {}
+        if max_workers <= 1:
+            stack = [root]
+            while stack:
+                directory = stack.pop()
+                try:
+                    scanned[directory] = self._scan_one(directory)
+                except OSError as e:
+                    if directory == root:
+                        raise
+                    self.logger.warning(f"无法扫描目录 {directory}: {e}")
+                    scanned[directory] = ([], [])
+                    continue
+                stack.extend(scanned[directory][1])
+            return scanned
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = {executor.submit(self._scan_one, root): root}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    directory = pending.pop(future)
+                    try:
+                        scanned[directory] = future.result()
+                    except OSError as e:
+                        if directory == root:
+                            raise
+                        # 与 glob 一致：无权限等无法读取的子目录直接跳过
+                        self.logger.warning(f"无法扫描目录 {directory}: {e}")
+                        scanned[directory] = ([], [])
+                        continue
+                    for subdir in scanned[directory][1]:
+                        pending[executor.submit(self._scan_one, subdir)] = subdir
+        return scanned
 
 
 class PDFMatcher:
@@ -285,7 +677,8 @@ class PDFMatcher:
         self,
         logger: Optional[logging.Logger] = None,
         title_column: str = 'Title',
-        doi_column: str = 'DOI'
+        doi_column: str = 'DOI',
+        fuzzy_threshold: Optional[float] = None
     ):
         """
         初始化匹配引擎
@@ -294,18 +687,28 @@ class PDFMatcher:
             logger: 日志记录器
             title_column: 数据源中的标题列名（CSV 用 'Title'，MongoDB 用 'label'）
             doi_column: 数据源中的 DOI 列名（CSV 用 'DOI'，MongoDB 用 'doi'）
+            fuzzy_threshold: Title 模糊匹配的相似度阈值（0~1），为 None 时不做模糊匹配；
+                需要安装 rapidfuzz 和 numpy
+        
+        Raises:
+            ValueError: fuzzy_threshold 不在 [0, 1] 之间
         """
+        if fuzzy_threshold is not None and not 0 <= fuzzy_threshold <= 1:
+            raise ValueError(f"fuzzy_threshold 必须在 [0, 1] 之间: {fuzzy_threshold}")
         self.logger = logger or logging.getLogger(__name__)
         self.pdf_scanner = PDFScanner(logger)
-        self.title_column = title_column
-        self.doi_column = doi_column
+        # 列名驻留后，与同样驻留的表头查字典时可按对象身份直接命中
+        self.title_column = sys.intern(title_column)
+        self.doi_column = sys.intern(doi_column)
+        self.fuzzy_threshold = fuzzy_threshold
     
     def match_all(
         self,
         pdfs_dir: Path,
         data_result: DataSourceResult,
         interactive: bool = False,
-        recursive_scan: bool = False
+        recursive_scan: bool = False,
+        pdf_files: Optional[Dict[str, Union[str, Path]]] = None
     ) -> BatchMatchResult:
         """
         匹配所有记录
@@ -315,6 +718,8 @@ class PDFMatcher:
             data_result: 数据源查询结果
             interactive: 是否交互模式
             recursive_scan: 是否递归扫描子目录
+            pdf_files: 已扫描好的 PDF 文件（scan_paths 或 scan_directory 的结果），
+                提供时不再扫描 pdfs_dir，便于与数据源读取并行
             
         Returns:
             BatchMatchResult 匹配结果
@@ -326,7 +731,8 @@ class PDFMatcher:
         self.logger.info(f"Title 列: {self.title_column}, DOI 列: {self.doi_column}")
         
         # 扫描 PDF 文件
-        pdf_files = self.pdf_scanner.scan_directory(pdfs_dir, recursive=recursive_scan)
+        if pdf_files is None:
+            pdf_files = self.pdf_scanner.scan_paths(pdfs_dir, recursive=recursive_scan)
         self.logger.info(f"找到 {len(pdf_files)} 个 PDF 文件")
         self.logger.info(f"读取到 {len(data_result.records)} 条记录")
         
@@ -349,118 +755,252 @@ class PDFMatcher:
             return result
         
         # 预处理 PDF 文件名：同时生成 Title 和 DOI 匹配的索引
-        title_index: Dict[str, List[Tuple[str, Path]]] = defaultdict(list)
-        doi_index: Dict[str, List[Tuple[str, Path]]] = defaultdict(list)
-        
         self.logger.info("分析 PDF 文件名...")
-        for pdf_name, pdf_path in pdf_files.items():
-            norm_title, norm_doi, is_doi = PDFNameAnalyzer.analyze(pdf_name)
-            
-            # DOI 格式的文件名不应参与 Title 匹配（移除数字后可能太短，容易误匹配）
-            # 同时要求 Title 索引的字符串至少有 10 个字符
-            if norm_title and not is_doi and len(norm_title) >= 10:
-                title_index[norm_title].append((pdf_name, pdf_path))
-            if norm_doi:
-                doi_index[norm_doi].append((pdf_name, pdf_path))
-            
-            self.logger.debug(
-                f"PDF: {pdf_name} -> Title索引: {norm_title[:30]}..., "
-                f"DOI索引: {norm_doi[:30]}..., DOI格式: {is_doi}"
-            )
+        title_keys, doi_keys, pdf_paths = self._build_indexes(pdf_files)
         
-        # 遍历记录进行匹配
+        # 先标准化全部记录，再一次性交给匹配内核
         self.logger.info("开始匹配记录...")
-        for idx, record in enumerate(data_result.records):
-            match_result = self._match_single_record(
-                idx, record, title_index, doi_index
+        records = data_result.records
+        norm_titles, norm_dois = self._normalize_records(records)
+        matches = _match_batch(norm_titles, norm_dois, title_keys, doi_keys)
+        
+        total = len(records)
+        matched_so_far = 0
+        results_append = result.results.append
+        matched_status = MatchStatus.MATCHED
+        unmatched_status = MatchStatus.UNMATCHED
+        multi_matched_status = MatchStatus.MULTI_MATCHED
+        info = self.logger.info
+        debug = self.logger.debug if self.logger.isEnabledFor(logging.DEBUG) else None
+        for idx, (record, (method, pdf_ids)) in enumerate(zip(records, matches)):
+            # 匹配过程中路径保持原样（通常为字符串），只为命中的 PDF 构造 Path
+            pdf_count = len(pdf_ids)
+            if pdf_count == 1:
+                matched_pdf = Path(pdf_paths[pdf_ids[0]])
+                results_append(MatchResult(idx, record, matched_status, [matched_pdf]))
+                matched_so_far += 1
+                if debug is not None:
+                    debug(
+                        "记录 %d: 成功匹配 (%s) -> '%s'",
+                        idx + 1, _MATCH_METHOD_NAMES[method], matched_pdf.name
+                    )
+            elif pdf_count == 0:
+                results_append(MatchResult(
+                    idx, record, unmatched_status, [], "未找到匹配的 PDF 文件"
+                ))
+                if debug is not None:
+                    debug("记录 %d: 未找到匹配的 PDF", idx + 1)
+            else:
+                # 多重匹配在循环结束后汇总输出警告
+                results_append(MatchResult(
+                    idx, record, multi_matched_status,
+                    [Path(pdf_paths[pdf_id]) for pdf_id in pdf_ids],
+                    f"匹配到 {pdf_count} 个 PDF 文件"
+                ))
+                if debug is not None:
+                    debug("记录 %d: 匹配到多个 PDF: %d 个", idx + 1, pdf_count)
+            
+            if (idx + 1) % PROGRESS_INTERVAL == 0:
+                info("进度 %d/%d, 已匹配 %d", idx + 1, total, matched_so_far)
+        
+        # 精确匹配失败的记录再尝试 Title 模糊匹配
+        if self.fuzzy_threshold is not None:
+            fuzzy_count = self._fuzzy_match_titles(result.results, title_keys, pdf_paths)
+            self.logger.info(f"Title 模糊匹配: {fuzzy_count} 条记录")
+        
+        # 多重匹配的记录汇总为一条警告
+        multi_matched = result.multi_matched_results
+        if multi_matched and self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(
+                "%d 条记录匹配到多个 PDF:\n%s",
+                len(multi_matched),
+                "\n".join(
+                    f"  记录 {r.record_index + 1}: {[p.name for p in r.matched_pdfs]}"
+                    for r in multi_matched
+                )
             )
-            result.results.append(match_result)
+        
+        # results 已填充完毕，统计一次各状态的记录数
+        result.recount()
         
         # 打印统计
         self._log_statistics(result)
         
         return result
     
-    def _match_single_record(
+    def _build_indexes(
         self,
-        idx: int,
-        record: Record,
-        title_index: Dict[str, List[Tuple[str, Path]]],
-        doi_index: Dict[str, List[Tuple[str, Path]]]
-    ) -> MatchResult:
-        """匹配单条记录"""
-        
-        # 获取 Title 和 DOI 值
-        title_value = record.get(self.title_column, "")
-        doi_value = record.get(self.doi_column, "")
-        
-        matching_pdfs = []
-        match_method = ""
-        
-        # 1. 优先尝试 DOI 匹配（更精确）
-        if doi_value:
-            norm_doi = TextNormalizer.normalize(str(doi_value), remove_numbers=False)
-            # DOI 必须有足够长度才进行匹配（避免短字符串误匹配）
-            if len(norm_doi) >= 5:
-                for pdf_norm_doi, pdf_list in doi_index.items():
-                    # DOI 完全匹配，或 PDF 的 DOI 包含在记录的 DOI 中（而非反过来）
-                    if pdf_norm_doi and len(pdf_norm_doi) >= 5 and (
-                        norm_doi == pdf_norm_doi or 
-                        pdf_norm_doi in norm_doi
-                    ):
-                        matching_pdfs.extend([path for _, path in pdf_list])
-                        match_method = "DOI"
-        
-        # 2. 如果 DOI 未匹配到，尝试 Title 匹配
-        if not matching_pdfs and title_value:
-            norm_title = TextNormalizer.normalize(str(title_value), remove_numbers=True)
-            for pdf_norm_title, pdf_list in title_index.items():
-                # Title 匹配：记录标题以 PDF 文件名开头
-                if pdf_norm_title and norm_title.startswith(pdf_norm_title):
-                    matching_pdfs.extend([path for _, path in pdf_list])
-                    match_method = "Title"
-        
-        # 去重（同一个 PDF 可能在两个索引中都存在）
-        matching_pdfs = list(dict.fromkeys(matching_pdfs))
-        
-        # 处理匹配结果
-        if len(matching_pdfs) == 0:
-            self.logger.debug(f"记录 {idx + 1}: 未找到匹配的 PDF")
-            return MatchResult(
-                record_index=idx,
-                record=record,
-                status=MatchStatus.UNMATCHED,
-                reason="未找到匹配的 PDF 文件"
-            )
-        elif len(matching_pdfs) == 1:
-            self.logger.info(
-                f"记录 {idx + 1}: 成功匹配 ({match_method}) -> '{matching_pdfs[0].name}'"
-            )
-            return MatchResult(
-                record_index=idx,
-                record=record,
-                status=MatchStatus.MATCHED,
-                matched_pdfs=matching_pdfs
-            )
-        else:
+        pdf_files: Dict[str, Union[str, Path]]
+    ) -> Tuple[_KeyIndex, _KeyIndex, List[Union[str, Path]]]:
+        """
+        单次遍历 PDF 文件名，构建 Title 索引和 DOI 索引
+        
+        索引的值为 PDF 编号，即在返回的路径列表中的下标。
+        
+        Returns:
+            (title_index, doi_index, pdf_paths)
+        """
+        pdf_paths: List[Union[str, Path]] = []
+        title_index: Dict[str, List[int]] = {}
+        doi_index: Dict[str, List[int]] = {}
+        title_get = title_index.get
+        doi_get = doi_index.get
+        analyze = PDFNameAnalyzer._analyze_cleaned
+        # 所有文件名一次性移除特殊编码
+        cleaned_names = TextNormalizer.remove_special_encoding_batch(list(pdf_files))
+        debug = self.logger.debug if self.logger.isEnabledFor(logging.DEBUG) else None
+        
+        for entry, ((pdf_name, pdf_path), cleaned_name) in enumerate(
+            zip(pdf_files.items(), cleaned_names)
+        ):
+            pdf_paths.append(pdf_path)
+            norm_title, norm_doi, is_doi = analyze(cleaned_name)
+            
+            # DOI 格式的文件名不应参与 Title 匹配（移除数字后可能太短，容易误匹配）
+            # 同时要求 Title 索引的字符串至少有 10 个字符
+            if len(norm_title) >= 10 and not is_doi:
+                bucket = title_get(norm_title)
+                if bucket is None:
+                    title_index[norm_title] = [entry]
+                else:
+                    bucket.append(entry)
+            if norm_doi:
+                bucket = doi_get(norm_doi)
+                if bucket is None:
+                    doi_index[norm_doi] = [entry]
+                else:
+                    bucket.append(entry)
+            
+            if debug is not None:
+                debug(
+                    "PDF: %s -> Title索引: %s..., DOI索引: %s..., DOI格式: %s",
+                    pdf_name, norm_title[:30], norm_doi[:30], is_doi
+                )
+        
+        return _KeyIndex(title_index), _KeyIndex(doi_index), pdf_paths
+    
+    def _normalize_records(self, records: List[Record]) -> Tuple[List[str], List[str]]:
+        """
+        标准化所有记录的 Title 和 DOI
+        
+        Returns:
+            (norm_titles, norm_dois)，不参与匹配的值为空字符串
+            （DOI 标准化后不足 5 个字符时不匹配，避免短字符串误匹配）
+        """
+        title_col = self.title_column
+        doi_col = self.doi_column
+        
+        titles: List[str] = []
+        dois: List[str] = []
+        for record in records:
+            title_value = record.get(title_col, "")
+            doi_value = record.get(doi_col, "")
+            titles.append(str(title_value) if title_value else "")
+            dois.append(str(doi_value) if doi_value else "")
+        
+        # 全部记录一次性标准化
+        norm_titles = TextNormalizer.normalize_batch(titles, remove_numbers=True)
+        norm_dois = [
+            norm_doi if len(norm_doi) >= 5 else ""
+            for norm_doi in TextNormalizer.normalize_batch(dois, remove_numbers=False)
+        ]
+        return norm_titles, norm_dois
+    
+    def _fuzzy_match_titles(
+        self,
+        results: List[MatchResult],
+        title_index: _KeyIndex,
+        pdf_paths: List[Union[str, Path]]
+    ) -> int:
+        """
+        对未匹配记录做 Title 模糊匹配，就地替换 results 中的结果
+        
+        与精确匹配的“记录标题以 PDF 文件名开头”对应：按 PDF Title 索引键的长度分组，
+        用 rapidfuzz.process.cdist 批量计算记录标题同长度前缀与各键的 Indel 相似度，
+        每条记录取相似度最高（相同时取较长的键）且不低于阈值的 PDF。
+        
+        Returns:
+            通过模糊匹配找到 PDF 的记录数
+        """
+        if rf_process is None or numpy is None:
             self.logger.warning(
-                f"记录 {idx + 1}: 匹配到多个 PDF: {[f.name for f in matching_pdfs]}"
-            )
-            return MatchResult(
-                record_index=idx,
-                record=record,
-                status=MatchStatus.MULTI_MATCHED,
-                matched_pdfs=matching_pdfs,
-                reason=f"匹配到 {len(matching_pdfs)} 个 PDF 文件"
+                "rapidfuzz 或 numpy 未安装，跳过 Title 模糊匹配。请运行: uv add rapidfuzz numpy"
             )
+            return 0
+        if not title_index.lengths:
+            return 0
+        
+        candidates = []
+        for i, match_result in enumerate(results):
+            if match_result.status != MatchStatus.UNMATCHED:
+                continue
+            title_value = match_result.record.get(self.title_column, "")
+            if not title_value:
+                continue
+            norm_title = TextNormalizer.normalize(str(title_value), remove_numbers=True)
+            if norm_title:
+                candidates.append((i, norm_title))
+        
+        keys_by_length = title_index.keys_by_length
+        score_cutoff = self.fuzzy_threshold * 100
+        matched = 0
+        
+        for start in range(0, len(candidates), FUZZY_CHUNK_SIZE):
+            chunk = candidates[start:start + FUZZY_CHUNK_SIZE]
+            best_scores = [0.0] * len(chunk)
+            best_keys: List[Optional[str]] = [None] * len(chunk)
+            
+            for length in reversed(title_index.lengths):
+                keys = keys_by_length[length]
+                # 低于阈值的分数为 0
+                scores = rf_process.cdist(
+                    [norm_title[:length] for _, norm_title in chunk],
+                    keys,
+                    scorer=rf_fuzz.ratio,
+                    score_cutoff=score_cutoff,
+                    workers=-1
+                )
+                for row, (score, col) in enumerate(zip(scores.max(axis=1), scores.argmax(axis=1))):
+                    if score > best_scores[row]:
+                        best_scores[row] = score
+                        best_keys[row] = keys[col]
+            
+            for (i, _), score, key in zip(chunk, best_scores, best_keys):
+                if key is None:
+                    continue
+                
+                unmatched = results[i]
+                matching_pdfs = [Path(pdf_paths[pdf_id]) for pdf_id in title_index.entries[key]]
+                reason = f"Title 模糊匹配（相似度 {score / 100:.2f}）"
+                if len(matching_pdfs) == 1:
+                    status = MatchStatus.MATCHED
+                else:
+                    status = MatchStatus.MULTI_MATCHED
+                    reason += f"，匹配到 {len(matching_pdfs)} 个 PDF 文件"
+                
+                results[i] = MatchResult(
+                    record_index=unmatched.record_index,
+                    record=unmatched.record,
+                    status=status,
+                    matched_pdfs=matching_pdfs,
+                    reason=reason
+                )
+                matched += 1
+                self.logger.debug(
+                    "记录 %d: %s -> '%s'",
+                    unmatched.record_index + 1, reason, matching_pdfs[0].name
+                )
+        
+        return matched
     
     def _log_statistics(self, result: BatchMatchResult):
         """输出统计信息"""
+        stats = result.to_stats_dict()
         self.logger.info(f"\n匹配统计:")
-        self.logger.info(f"  记录数: {result.total_records}")
-        self.logger.info(f"  PDF 文件数: {result.total_pdfs}")
-        self.logger.info(f"  成功匹配: {result.matched_count}")
-        self.logger.info(f"  未匹配:   {result.unmatched_count}")
-        self.logger.info(f"  多重匹配: {result.multi_matched_count}")
+        self.logger.info(f"  记录数: {stats['total_records']}")
+        self.logger.info(f"  PDF 文件数: {stats['total_pdfs']}")
+        self.logger.info(f"  成功匹配: {stats['matched']}")
+        self.logger.info(f"  未匹配:   {stats['unmatched']}")
+        self.logger.info(f"  多重匹配: {stats['multi_matched']}")
         if result.total_records > 0:
             self.logger.info(f"  匹配率:   {result.match_rate*100:.1f}%")
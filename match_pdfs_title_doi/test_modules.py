@@ -13,10 +13,13 @@
 7. CSVExporter - 结果导出
 """
 
+import io
+import os
 import sys
 import tempfile
 import csv
 from pathlib import Path
+from typing import Optional
 
 # 确保可以导入模块
 sys.path.insert(0, str(Path(__file__).parent))
@@ -24,12 +27,14 @@ sys.path.insert(0, str(Path(__file__).parent))
 from data_sources import (
     FieldMapping,
     Record,
+    RowRecord,
     DataSourceResult,
     CSVDataSource,
     CSV_FIELD_MAPPING,
     MONGODB_FIELD_MAPPING,
 )
 from matcher import (
+    clear_caches,
     TextNormalizer,
     PDFNameAnalyzer,
     PDFMatcher,
@@ -39,6 +44,8 @@ from matcher import (
 from exporters import (
     generate_doi_url,
     CSVExporter,
+    JSONLExporter,
+    create_exporter,
     PDFCopier,
     CSVMerger,
     SummaryGenerator,
@@ -46,58 +53,103 @@ from exporters import (
 
 
 class TestRunner:
-    """简单的测试运行器"""
+    """
+    简单的测试运行器
+    
+    断言结果先写入内存缓冲区，由 flush() 一次性输出（main 在每个测试函数结束后调用）。
+    各测试的临时文件放在同一个会话临时目录下（temp_dir()），全部测试结束后由
+    cleanup() 一次性删除。
+    
+    通过的断言默认只计数不输出；设置环境变量 VERBOSE=1 时逐条输出 ✅ 行。
+    """
     
     def __init__(self):
         self.passed = 0
         self.failed = 0
         self.errors = []
+        self._out = io.StringIO()
+        self._temp_dir: Optional[tempfile.TemporaryDirectory] = None
+        self._temp_root: Optional[Path] = None
+        self._verbose = os.environ.get('VERBOSE', '') not in ('', '0')
+    
+    def _session_root(self) -> Path:
+        """返回会话临时目录，首次调用时创建（由创建它的运行器负责删除）"""
+        if self._temp_root is None:
+            self._temp_dir = tempfile.TemporaryDirectory(prefix="match_pdfs_test_")
+            self._temp_root = Path(self._temp_dir.name)
+        return self._temp_root
+    
+    def temp_dir(self, name: str) -> Path:
+        """在会话临时目录下创建并返回名为 name 的子目录"""
+        path = self._session_root() / name
+        path.mkdir()
+        return path
+    
+    def cleanup(self):
+        """删除会话临时目录"""
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+            self._temp_root = None
+    
+    def _emit(self, line: str):
+        """缓冲一行输出"""
+        self._out.write(line + "\n")
+    
+    def section(self, title: str):
+        """立即输出测试分组标题，使其出现在该测试的日志之前"""
+        self.flush()
+        print(f"\n📋 {title}", flush=True)
+    
+    def flush(self):
+        """输出缓冲区中的内容并清空"""
+        sys.stdout.write(self._out.getvalue())
+        sys.stdout.flush()
+        self._out = io.StringIO()
     
     def assert_equal(self, actual, expected, msg=""):
         """断言相等"""
         if actual == expected:
             self.passed += 1
-            print(f"  ✅ {msg}" if msg else "  ✅ PASS")
+            if self._verbose:
+                self._emit(f"  ✅ {msg}" if msg else "  ✅ PASS")
         else:
             self.failed += 1
             error_msg = f"  ❌ {msg}: 期望 {expected!r}, 实际 {actual!r}"
             self.errors.append(error_msg)
-            print(error_msg)
+            self._emit(error_msg)
     
     def assert_true(self, condition, msg=""):
         """断言为真"""
         if condition:
             self.passed += 1
-            print(f"  ✅ {msg}" if msg else "  ✅ PASS")
+            if self._verbose:
+                self._emit(f"  ✅ {msg}" if msg else "  ✅ PASS")
         else:
             self.failed += 1
             error_msg = f"  ❌ {msg}: 期望 True, 实际 False"
             self.errors.append(error_msg)
-            print(error_msg)
+            self._emit(error_msg)
     
     def assert_false(self, condition, msg=""):
         """断言为假"""
         self.assert_true(not condition, msg)
     
-    def assert_raises(self, exception_type, func, msg=""):
-        """断言抛出异常"""
-        try:
+    def assert_raises(self, exception_type, func=None, msg=""):
+        """
+        断言抛出异常
+        
+        不传 func 时返回上下文管理器：with t.assert_raises(ValueError, msg=...): ...
+        """
+        raises = _Raises(self, exception_type, msg)
+        if func is None:
+            return raises
+        with raises:
             func()
-            self.failed += 1
-            error_msg = f"  ❌ {msg}: 期望抛出 {exception_type.__name__}, 但未抛出"
-            self.errors.append(error_msg)
-            print(error_msg)
-        except exception_type:
-            self.passed += 1
-            print(f"  ✅ {msg}" if msg else "  ✅ PASS")
-        except Exception as e:
-            self.failed += 1
-            error_msg = f"  ❌ {msg}: 期望抛出 {exception_type.__name__}, 实际抛出 {type(e).__name__}"
-            self.errors.append(error_msg)
-            print(error_msg)
     
     def summary(self):
         """输出测试摘要"""
+        self.flush()
         print("\n" + "=" * 60)
         print(f"测试摘要: 通过 {self.passed}, 失败 {self.failed}")
         print("=" * 60)
@@ -110,9 +162,42 @@ class TestRunner:
         return self.failed == 0
 
 
+class _Raises:
+    """TestRunner.assert_raises 的上下文管理器形式，with 块内的其他异常记为失败"""
+    
+    def __init__(self, runner: TestRunner, exception_type, msg: str = ""):
+        self.runner = runner
+        self.exception_type = exception_type
+        self.msg = msg
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        runner = self.runner
+        if exc_type is not None and issubclass(exc_type, self.exception_type):
+            runner.passed += 1
+            if runner._verbose:
+                runner._emit(f"  ✅ {self.msg}" if self.msg else "  ✅ PASS")
+            return True
+        if exc_type is None:
+            error_msg = f"  ❌ {self.msg}: 期望抛出 {self.exception_type.__name__}, 但未抛出"
+        elif issubclass(exc_type, Exception):
+            error_msg = (
+                f"  ❌ {self.msg}: 期望抛出 {self.exception_type.__name__}, "
+                f"实际抛出 {exc_type.__name__}"
+            )
+        else:
+            return False
+        runner.failed += 1
+        runner.errors.append(error_msg)
+        runner._emit(error_msg)
+        return True
+
+
 def test_text_normalizer(t: TestRunner):
     """测试 TextNormalizer"""
-    print("\n📋 测试 TextNormalizer")
+    t.section("测试 TextNormalizer")
     
     # 测试 normalize 方法 - 移除数字
     t.assert_equal(
@@ -142,6 +227,29 @@ def test_text_normalizer(t: TestRunner):
         "normalize() 特殊字符"
     )
     
+    # 测试非 ASCII 字符（小写化后仍非 ASCII 的字符被移除）
+    t.assert_equal(
+        TextNormalizer.normalize("Café Straße 中文 K2", remove_numbers=False),
+        "cafstraek2",
+        "normalize() 非 ASCII 字符"
+    )
+    
+    # 测试批量标准化
+    texts = ["Hello World 123", "", "Café K2", "A-B_C.D"]
+    for remove_numbers in (True, False):
+        t.assert_equal(
+            TextNormalizer.normalize_batch(texts, remove_numbers=remove_numbers),
+            [TextNormalizer.normalize(text, remove_numbers=remove_numbers) for text in texts],
+            f"normalize_batch() 与逐个处理一致 (remove_numbers={remove_numbers})"
+        )
+    
+    # 测试结果缓存
+    hits = TextNormalizer.normalize.cache_info().hits
+    TextNormalizer.normalize("Hello World 123", remove_numbers=True)
+    t.assert_equal(TextNormalizer.normalize.cache_info().hits, hits + 1, "normalize() 命中缓存")
+    clear_caches()
+    t.assert_equal(TextNormalizer.normalize.cache_info().currsize, 0, "clear_caches() 清空缓存")
+    
     # 测试 remove_special_encoding 方法
     t.assert_equal(
         TextNormalizer.remove_special_encoding("file#x3f;name.pdf"),
@@ -154,11 +262,18 @@ def test_text_normalizer(t: TestRunner):
         "testfile",
         "remove_special_encoding() 移除多个编码"
     )
+    
+    names = ["file#x3f;name", "plain", "", "a#x3a;b#x2f;c", "sep\x1fname#x3f;"]
+    t.assert_equal(
+        TextNormalizer.remove_special_encoding_batch(names),
+        [TextNormalizer.remove_special_encoding(name) for name in names],
+        "remove_special_encoding_batch() 与逐个处理一致"
+    )
 
 
 def test_pdf_name_analyzer(t: TestRunner):
     """测试 PDFNameAnalyzer"""
-    print("\n📋 测试 PDFNameAnalyzer")
+    t.section("测试 PDFNameAnalyzer")
     
     # 测试 DOI 格式 - isj.
     norm_title, norm_doi, is_doi = PDFNameAnalyzer.analyze("isj.12345")
@@ -182,11 +297,20 @@ def test_pdf_name_analyzer(t: TestRunner):
     # 测试特殊编码移除
     norm_title, norm_doi, is_doi = PDFNameAnalyzer.analyze("Title#x3f;With_2024_DSS")
     t.assert_equal(norm_title, "titlewith", "特殊编码被移除")
+    
+    # 分析结果按移除特殊编码后的文件名缓存
+    hits = PDFNameAnalyzer._analyze_cleaned.cache_info().hits
+    t.assert_equal(
+        PDFNameAnalyzer.analyze("Title#x3f;With_2024_DSS"),
+        (norm_title, norm_doi, is_doi),
+        "analyze() 结果一致"
+    )
+    t.assert_equal(PDFNameAnalyzer._analyze_cleaned.cache_info().hits, hits + 1, "analyze() 命中缓存")
 
 
 def test_field_mapping(t: TestRunner):
     """测试 FieldMapping"""
-    print("\n📋 测试 FieldMapping")
+    t.section("测试 FieldMapping")
     
     # 测试默认值
     mapping = FieldMapping()
@@ -199,6 +323,23 @@ def test_field_mapping(t: TestRunner):
     t.assert_equal(MONGODB_FIELD_MAPPING.title, "label", "MongoDB 映射 title")
     t.assert_equal(MONGODB_FIELD_MAPPING.uuid, "uuid", "MongoDB 映射 uuid")
     
+    # 测试 MongoDB 投影（默认读取完整文档，映射了 uuid 时不读取 _id）
+    from data_sources import MongoDBDataSource
+    source = MongoDBDataSource("mongodb://localhost:27017", "db", "papers")
+    t.assert_true(source._projection is None, "默认读取完整文档")
+    source = MongoDBDataSource("mongodb://localhost:27017", "db", "papers", project_fields=True)
+    t.assert_equal(
+        source._projection,
+        {'label': 1, 'doi': 1, 'uuid': 1, '_id': 0},
+        "MongoDB 投影"
+    )
+    source = MongoDBDataSource(
+        "mongodb://localhost:27017", "db", "papers",
+        field_mapping=FieldMapping(title="label", doi="doi"),
+        project_fields=True
+    )
+    t.assert_equal(source._projection, {'label': 1, 'doi': 1, '_id': 1}, "无 uuid 时保留 _id")
+    
     # 测试 to_dict
     d = CSV_FIELD_MAPPING.to_dict()
     t.assert_equal(d['title'], "Title", "to_dict() 正确")
@@ -206,7 +347,7 @@ def test_field_mapping(t: TestRunner):
 
 def test_record(t: TestRunner):
     """测试 Record 类"""
-    print("\n📋 测试 Record")
+    t.section("测试 Record")
     
     record = Record(
         data={'Title': 'Test Article', 'DOI': '10.1234/test'},
@@ -231,11 +372,62 @@ def test_record(t: TestRunner):
     # 测试 to_dict
     d = record.to_dict()
     t.assert_equal(d['Title'], 'Test Article', "to_dict() 方法")
+    
+    # 测试 to_dict_with
+    d = record.to_dict_with(Extra='x')
+    t.assert_equal(d['Extra'], 'x', "to_dict_with() 附加字段")
+    t.assert_false('Extra' in record, "to_dict_with() 不修改原记录")
+    
+    # 使用 __slots__，实例没有 __dict__
+    t.assert_false(hasattr(record, '__dict__'), "Record 使用 __slots__")
+    
+    # RowRecord 与按 csv.DictReader 构造的 Record 行为一致
+    text = "Title,DOI,Year\nShort Row,10.1/a\nLong Row,10.1/b,2024,extra\n"
+    dict_records = [Record(data=row) for row in csv.DictReader(io.StringIO(text))]
+    reader = csv.reader(io.StringIO(text))
+    fieldnames = next(reader)
+    index = {name: i for i, name in enumerate(fieldnames)}
+    row_records = [RowRecord(row, fieldnames, index) for row in reader]
+    t.assert_equal(
+        [r.to_dict() for r in row_records],
+        [r.to_dict() for r in dict_records],
+        "RowRecord.to_dict() 与 csv.DictReader 一致"
+    )
+    short_row, long_row = row_records
+    t.assert_equal(
+        [short_row.get('Year', 'x'), short_row.get('missing', 'x'), short_row['DOI']],
+        [None, 'x', '10.1/a'],
+        "RowRecord 取值规则"
+    )
+    t.assert_true(None in long_row and None not in short_row, "RowRecord 多出的值放在 None 键下")
+    t.assert_raises(KeyError, lambda: short_row['missing'], "RowRecord 缺失键抛出 KeyError")
+    t.assert_true(short_row.copy().index is index, "RowRecord.copy() 共享表头索引")
+    t.assert_false(hasattr(short_row, '__dict__'), "RowRecord 使用 __slots__")
+    
+    # 复制、序列化和相等比较
+    import copy
+    import pickle
+    t.assert_equal(short_row, dict_records[0], "RowRecord 与内容相同的 Record 相等")
+    t.assert_equal(dict_records[0], short_row, "Record 与内容相同的 RowRecord 相等")
+    t.assert_equal(copy.copy(long_row), long_row, "copy.copy() 复制 RowRecord")
+    t.assert_equal(copy.deepcopy(long_row), long_row, "copy.deepcopy() 复制 RowRecord")
+    t.assert_equal(pickle.loads(pickle.dumps(long_row)), long_row, "RowRecord 可 pickle")
+    
+    # 通过 data 修改字段后保留修改
+    edited = short_row.copy()
+    edited.data['Title'] = 'Edited'
+    t.assert_equal(
+        [edited['Title'], edited.get('Title'), edited.to_dict()['Title']],
+        ['Edited', 'Edited', 'Edited'],
+        "RowRecord.data 的修改保留"
+    )
+    t.assert_equal(short_row['Title'], 'Short Row', "修改副本不影响原记录")
+    t.assert_equal(pickle.loads(pickle.dumps(edited))['Title'], 'Edited', "pickle 保留修改")
 
 
 def test_data_source_result(t: TestRunner):
     """测试 DataSourceResult"""
-    print("\n📋 测试 DataSourceResult")
+    t.section("测试 DataSourceResult")
     
     records = [
         Record(data={'Title': 'Article 1'}),
@@ -254,52 +446,90 @@ def test_data_source_result(t: TestRunner):
 
 def test_csv_data_source(t: TestRunner):
     """测试 CSVDataSource"""
-    print("\n📋 测试 CSVDataSource")
+    t.section("测试 CSVDataSource")
     
     # 创建临时 CSV 文件
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, 
-                                       newline='', encoding='utf-8-sig') as f:
+    csv_path = t.temp_dir("csv_data_source") / "records.csv"
+    with open(csv_path, 'w', newline='', encoding='utf-8-sig') as f:
         writer = csv.writer(f)
         writer.writerow(['Title', 'DOI', 'Year'])
         writer.writerow(['Test Article 1', '10.1234/test1', '2024'])
         writer.writerow(['Test Article 2', '10.1234/test2', '2023'])
-        csv_path = Path(f.name)
     
-    try:
-        # 测试单文件模式
-        source = CSVDataSource(csv_file=csv_path)
-        t.assert_equal(source.source_type, 'csv', "source_type 正确")
-        
-        # 测试连接
-        t.assert_true(source.connect(), "connect() 成功")
-        
-        # 测试获取记录
-        result = source.get_records()
-        t.assert_equal(len(result.records), 2, "读取记录数量正确")
-        t.assert_true('Title' in result.headers, "headers 包含 Title")
-        
-        # 验证记录内容
-        t.assert_equal(
-            result.records[0].get('Title'), 
-            'Test Article 1', 
-            "记录内容正确"
-        )
-        
-        # 测试断开连接
-        source.disconnect()
-        
-        # 测试不存在的文件
-        bad_source = CSVDataSource(csv_file=Path('nonexistent.csv'))
-        t.assert_false(bad_source.connect(), "不存在的文件返回 False")
-        
-    finally:
-        # 清理临时文件
-        csv_path.unlink()
+    # 测试单文件模式
+    source = CSVDataSource(csv_file=csv_path)
+    t.assert_equal(source.source_type, 'csv', "source_type 正确")
+    t.assert_true(
+        source.logger is CSVDataSource().logger,
+        "默认日志记录器按类缓存"
+    )
+    
+    # 测试连接
+    t.assert_true(source.connect(), "connect() 成功")
+    
+    # 测试获取记录
+    result = source.get_records()
+    t.assert_equal(len(result.records), 2, "读取记录数量正确")
+    t.assert_true('Title' in result.headers, "headers 包含 Title")
+    t.assert_true(
+        all(name is sys.intern(name) for name in result.headers),
+        "表头字符串已驻留"
+    )
+    
+    # 验证记录内容
+    t.assert_equal(
+        result.records[0].get('Title'), 
+        'Test Article 1', 
+        "记录内容正确"
+    )
+    
+    # 测试流式读取
+    streamed = list(source.iter_records())
+    t.assert_equal(len(streamed), 2, "iter_records() 记录数量正确")
+    t.assert_equal(streamed[1].get('DOI'), '10.1234/test2', "iter_records() 记录内容正确")
+    
+    # 基类的默认 iter_records() 基于 get_records()
+    from data_sources import DataSource
+    t.assert_equal(
+        [r.data for r in DataSource.iter_records(source)],
+        [r.data for r in streamed],
+        "DataSource.iter_records() 默认实现"
+    )
+    
+    # 测试过滤条件
+    filtered = source.get_records(query={'Year': '2023'})
+    t.assert_equal(len(filtered.records), 1, "query 过滤记录")
+    filtered = source.get_records(query={'Year': '2024', 'DOI': '10.1234/test1'})
+    t.assert_equal(len(filtered.records), 1, "多字段 query 过滤记录")
+    filtered = list(source.iter_records(query={'Missing': 'x'}))
+    t.assert_equal(len(filtered), 0, "query 字段不存在时无匹配")
+    filtered = list(source.iter_records(query={'Year': '2023', 'Missing': None}))
+    t.assert_equal(len(filtered), 1, "query 不存在字段按 None 比较")
+    
+    # 空行、短行、长行的处理与 csv.DictReader 一致
+    with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+        f.write('Title,DOI,Year\nA,10.1/a,2024\n\nB,10.1/b\nC,10.1/c,2023,extra\n')
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        expected = list(csv.DictReader(f))
+    t.assert_equal(
+        [r.data for r in source.iter_records()],
+        expected,
+        "csv.reader 行与 DictReader 一致"
+    )
+    filtered = list(source.iter_records(query={'Year': None}))
+    t.assert_equal([r.get('Title') for r in filtered], ['B'], "短行缺失列按 None 过滤")
+    
+    # 测试断开连接
+    source.disconnect()
+    
+    # 测试不存在的文件
+    bad_source = CSVDataSource(csv_file=Path('nonexistent.csv'))
+    t.assert_false(bad_source.connect(), "不存在的文件返回 False")
 
 
 def test_generate_doi_url(t: TestRunner):
     """测试 generate_doi_url"""
-    print("\n📋 测试 generate_doi_url")
+    t.section("测试 generate_doi_url")
     
     t.assert_equal(
         generate_doi_url("10.1234/test"),
@@ -326,21 +556,60 @@ def test_generate_doi_url(t: TestRunner):
     )
 
 
+def test_pdf_scanner(t: TestRunner):
+    """测试 PDFScanner"""
+    t.section("测试 PDFScanner")
+    
+    from matcher import PDFScanner
+    
+    temp_dir = t.temp_dir("pdf_scanner")
+    
+    (temp_dir / "sub" / "deep").mkdir(parents=True)
+    open(temp_dir / "top.pdf", "wb").close()
+    open(temp_dir / "UPPER.PDF", "wb").close()
+    open(temp_dir / "notes.txt", "wb").close()
+    open(temp_dir / "sub" / "inner.pdf", "wb").close()
+    open(temp_dir / "sub" / "deep" / "top.pdf", "wb").close()
+    
+    scanner = PDFScanner()
+    
+    flat = scanner.scan_directory(temp_dir)
+    t.assert_equal(sorted(flat), ['UPPER', 'top'], "非递归扫描")
+    t.assert_equal(flat['top'], temp_dir / "top.pdf", "扫描结果路径")
+    t.assert_equal(
+        scanner.scan_paths(temp_dir),
+        {stem: str(path) for stem, path in flat.items()},
+        "scan_paths() 返回字符串路径"
+    )
+    
+    nested = scanner.scan_directory(temp_dir, recursive=True)
+    t.assert_equal(sorted(nested), ['UPPER', 'inner', 'top'], "递归扫描")
+    t.assert_equal(
+        scanner.scan_directory(temp_dir, recursive=True, max_workers=1),
+        nested,
+        "单线程递归扫描结果一致"
+    )
+    t.assert_equal(
+        nested['top'],
+        temp_dir / "sub" / "deep" / "top.pdf",
+        "同名文件以深度优先顺序中后出现的为准"
+    )
+    
+    t.assert_equal(scanner.scan_directory(temp_dir / "missing"), {}, "不存在的目录")
+
+
 def test_pdf_matcher(t: TestRunner):
     """测试 PDFMatcher 核心匹配逻辑"""
-    print("\n📋 测试 PDFMatcher")
+    t.section("测试 PDFMatcher")
     
     # 创建临时目录和 PDF 文件
-    import tempfile
-    import shutil
-    
-    temp_dir = Path(tempfile.mkdtemp())
+    temp_dir = t.temp_dir("pdf_matcher")
     pdf_dir = temp_dir / "pdfs"
     pdf_dir.mkdir()
     
     # 创建模拟的 PDF 文件（只需要存在，不需要真正是 PDF）
-    (pdf_dir / "A-computer-vision-based_2024_DSS.pdf").write_text("")
-    (pdf_dir / "isj.12345.pdf").write_text("")
+    open(pdf_dir / "A-computer-vision-based_2024_DSS.pdf", "wb").close()
+    open(pdf_dir / "isj.12345.pdf", "wb").close()
     
     # 创建数据记录
     records = [
@@ -364,94 +633,444 @@ def test_pdf_matcher(t: TestRunner):
         source_name='test'
     )
     
+    # 创建匹配器
+    matcher = PDFMatcher(title_column='Title', doi_column='DOI')
+    
+    # 执行匹配
+    result = matcher.match_all(pdfs_dir=pdf_dir, data_result=data_result)
+    
+    t.assert_equal(result.total_records, 3, "总记录数")
+    t.assert_equal(result.total_pdfs, 2, "总 PDF 数")
+    
+    # 检查匹配结果（至少应该有一些匹配）
+    t.assert_true(
+        result.matched_count + result.unmatched_count + result.multi_matched_count == 3,
+        "结果分类完整"
+    )
+    t.assert_equal(
+        (result.matched_count, result.unmatched_count, result.multi_matched_count),
+        (2, 1, 0),
+        "匹配 / 未匹配 / 多重匹配计数"
+    )
+    
+    # PDF 的 DOI 包含在记录的 DOI 中，Title 以 PDF 文件名开头
+    t.assert_equal(
+        [r.matched_pdf.name if r.matched_pdf else None for r in result.results],
+        ['A-computer-vision-based_2024_DSS.pdf', 'isj.12345.pdf', None],
+        "DOI 子串匹配与 Title 前缀匹配"
+    )
+    
+    # 传入预先扫描的 PDF 文件时不再扫描目录；同一批文件名的分析结果命中缓存
+    pdf_files = matcher.pdf_scanner.scan_directory(pdf_dir)
+    hits = PDFNameAnalyzer._analyze_cleaned.cache_info().hits
+    prescanned = matcher.match_all(
+        pdfs_dir=temp_dir / "missing",
+        data_result=data_result,
+        pdf_files=pdf_files
+    )
+    t.assert_equal(
+        PDFNameAnalyzer._analyze_cleaned.cache_info().hits - hits,
+        len(pdf_files),
+        "重复匹配同一目录时文件名分析命中缓存"
+    )
+    t.assert_equal(prescanned.matched_count, result.matched_count, "match_all() 使用预扫描结果")
+    t.assert_true(
+        all(isinstance(p, Path) for r in result.results for p in r.matched_pdfs),
+        "扫描得到字符串路径，匹配结果中为 Path"
+    )
+    
+    # 同一标准化 Title 对应多个 PDF 时为多重匹配
+    multi_dir = temp_dir / "multi"
+    multi_dir.mkdir()
+    open(multi_dir / "A-computer-vision-based_2024_DSS.pdf", "wb").close()
+    open(multi_dir / "A-Computer-Vision-Based_2023_ISJ.pdf", "wb").close()
+    multi = matcher.match_all(pdfs_dir=multi_dir, data_result=data_result)
+    t.assert_equal(
+        [r.status for r in multi.results],
+        [MatchStatus.MULTI_MATCHED, MatchStatus.UNMATCHED, MatchStatus.UNMATCHED],
+        "同一 Title 键下的多个 PDF 为多重匹配"
+    )
+    t.assert_equal(len(multi.results[0].matched_pdfs), 2, "多重匹配包含全部 PDF")
+    
+    # PDF 的 DOI 在记录 DOI 的中间（不是后缀）时也能匹配
+    suffixed = DataSourceResult(
+        records=[Record(data={'Title': '', 'DOI': '10.1111/isj.12345.supp'})],
+        headers=['Title', 'DOI'],
+        source_name='suffixed'
+    )
+    t.assert_equal(
+        matcher.match_all(pdf_dir, suffixed).results[0].matched_pdf.name,
+        'isj.12345.pdf',
+        "DOI 子串匹配"
+    )
+    
+    # 一个 PDF 的 DOI 是记录 DOI 的后缀、另一个在中间：两个都应命中
+    doi_multi_dir = temp_dir / "doi_multi"
+    doi_multi_dir.mkdir()
+    open(doi_multi_dir / "isj.12345.pdf", "wb").close()
+    open(doi_multi_dir / "isj.12345.supp.pdf", "wb").close()
+    doi_multi = matcher.match_all(doi_multi_dir, suffixed).results[0]
+    t.assert_equal(doi_multi.status, MatchStatus.MULTI_MATCHED, "后缀键和中间子串键同时命中为多重匹配")
+    t.assert_equal(
+        sorted(p.name for p in doi_multi.matched_pdfs),
+        ['isj.12345.pdf', 'isj.12345.supp.pdf'],
+        "多重 DOI 匹配包含全部 PDF"
+    )
+    
+    # Title 模糊匹配（需要 rapidfuzz 和 numpy；任一未安装时跳过模糊匹配，结果不变）
+    noisy = DataSourceResult(
+        records=[Record(data={'Title': 'A computer vlsion based concept', 'DOI': ''})],
+        headers=['Title', 'DOI'],
+        source_name='noisy'
+    )
+    t.assert_equal(matcher.match_all(pdf_dir, noisy).matched_count, 0, "默认不做模糊匹配")
+    fuzzy_matcher = PDFMatcher(title_column='Title', doi_column='DOI', fuzzy_threshold=0.9)
+    fuzzy_result = fuzzy_matcher.match_all(pdf_dir, noisy)
     try:
-        # 创建匹配器
-        matcher = PDFMatcher(title_column='Title', doi_column='DOI')
-        
-        # 执行匹配
-        result = matcher.match_all(pdfs_dir=pdf_dir, data_result=data_result)
-        
-        t.assert_equal(result.total_records, 3, "总记录数")
-        t.assert_equal(result.total_pdfs, 2, "总 PDF 数")
-        
-        # 检查匹配结果（至少应该有一些匹配）
-        t.assert_true(
-            result.matched_count + result.unmatched_count + result.multi_matched_count == 3,
-            "结果分类完整"
+        import numpy  # noqa: F401
+        import rapidfuzz  # noqa: F401
+        t.assert_equal(
+            fuzzy_result.results[0].matched_pdf,
+            pdf_dir / "A-computer-vision-based_2024_DSS.pdf",
+            "Title 模糊匹配"
         )
-        
-        # 检查 match_rate 计算
-        if result.total_records > 0:
-            expected_rate = result.matched_count / result.total_records
-            t.assert_equal(result.match_rate, expected_rate, "match_rate 计算正确")
-        
-    finally:
-        # 清理
-        shutil.rmtree(temp_dir)
+    except ImportError:
+        t.assert_equal(fuzzy_result.matched_count, 0, "rapidfuzz 或 numpy 未安装时跳过模糊匹配")
+    for threshold in (-1, 1.5):
+        t.assert_raises(
+            ValueError,
+            lambda: PDFMatcher(fuzzy_threshold=threshold),
+            f"fuzzy_threshold={threshold} 超出 [0, 1]"
+        )
+    
+    # 检查 match_rate 计算
+    if result.total_records > 0:
+        expected_rate = result.matched_count / result.total_records
+        t.assert_equal(result.match_rate, expected_rate, "match_rate 计算正确")
 
 
 def test_csv_exporter(t: TestRunner):
     """测试 CSVExporter"""
-    print("\n📋 测试 CSVExporter")
+    t.section("测试 CSVExporter")
     
-    import tempfile
-    import shutil
+    temp_dir = t.temp_dir("csv_exporter")
     
-    temp_dir = Path(tempfile.mkdtemp())
+    # 创建模拟的 BatchMatchResult
+    from matcher import MatchResult
     
-    try:
-        # 创建模拟的 BatchMatchResult
-        from matcher import MatchResult
-        
-        records = [
-            Record(data={'Title': 'Article 1', 'DOI': '10.1234/a'}),
-            Record(data={'Title': 'Article 2', 'DOI': '10.1234/b'}),
-        ]
-        
-        match_results = [
-            MatchResult(
-                record_index=0,
-                record=records[0],
-                status=MatchStatus.MATCHED,
-                matched_pdfs=[Path('/test/article1.pdf')]
-            ),
-            MatchResult(
-                record_index=1,
-                record=records[1],
-                status=MatchStatus.UNMATCHED,
-                reason="未找到匹配"
-            ),
+    records = [
+        Record(data={'Title': 'Article 1', 'DOI': '10.1234/a'}),
+        Record(data={'Title': 'Article 2', 'DOI': '10.1234/b'}),
+    ]
+    
+    match_results = [
+        MatchResult(
+            record_index=0,
+            record=records[0],
+            status=MatchStatus.MATCHED,
+            matched_pdfs=[Path('/test/article1.pdf')]
+        ),
+        MatchResult(
+            record_index=1,
+            record=records[1],
+            status=MatchStatus.UNMATCHED,
+            reason="未找到匹配"
+        ),
+    ]
+    
+    batch_result = BatchMatchResult(
+        source_name='test',
+        total_records=2,
+        total_pdfs=1,
+        results=match_results
+    )
+    
+    # 测试导出
+    exporter = CSVExporter(output_dir=temp_dir)
+    paths = exporter.export_all(
+        batch_result,
+        headers=['Title', 'DOI'],
+        field_mapping=CSV_FIELD_MAPPING
+    )
+    
+    t.assert_true(paths['matched'] is not None, "导出匹配结果")
+    t.assert_true(paths['unmatched'] is not None, "导出未匹配结果")
+    
+    # 验证文件存在
+    if paths['matched']:
+        t.assert_true(paths['matched'].exists(), "匹配文件存在")
+    
+    # 验证文件内容（表头中有、记录中缺失的字段写为空字符串）
+    with open(paths['matched'], 'r', encoding='utf-8-sig', newline='') as f:
+        matched_rows = list(csv.reader(f))
+    t.assert_equal(
+        matched_rows,
+        [['Title', 'DOI', 'Matched_PDF_Path'],
+         ['Article 1', '10.1234/a', str(Path('/test/article1.pdf'))]],
+        "匹配 CSV 内容"
+    )
+    narrow_paths = CSVExporter(output_dir=temp_dir / "narrow").export_all(
+        batch_result,
+        headers=['Title', 'Year'],
+        field_mapping=CSV_FIELD_MAPPING
+    )
+    with open(narrow_paths['unmatched'], 'r', encoding='utf-8-sig', newline='') as f:
+        unmatched_rows = list(csv.reader(f))
+    t.assert_equal(
+        unmatched_rows,
+        [['Title', 'Year', 'Unmatch_Reason'], ['Article 2', '', '未找到匹配']],
+        "未匹配 CSV 按表头取值"
+    )
+    
+    # 测试 JSONL 导出
+    import json
+    jsonl_exporter = create_exporter('jsonl', temp_dir / "jsonl")
+    t.assert_true(isinstance(jsonl_exporter, JSONLExporter), "create_exporter('jsonl')")
+    jsonl_paths = jsonl_exporter.export_all(
+        batch_result,
+        headers=['Title', 'DOI'],
+        field_mapping=CSV_FIELD_MAPPING
+    )
+    with open(jsonl_paths['matched'], 'r', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    t.assert_equal(len(lines), 1, "JSONL 匹配行数")
+    t.assert_equal(lines[0]['DOI'], '10.1234/a', "JSONL 记录内容")
+    t.assert_equal(
+        lines[0]['Matched_PDF_Path'],
+        str(Path('/test/article1.pdf')),
+        "JSONL Matched_PDF_Path"
+    )
+    from exporters import _dumps_jsonl
+    overflow_row = {'Title': 'Article 3', None: ['extra']}
+    t.assert_equal(
+        json.loads(_dumps_jsonl(overflow_row)),
+        {'Title': 'Article 3', 'null': ['extra']},
+        "JSONL 序列化非字符串键"
+    )
+    with t.assert_raises(ValueError, msg="不支持的导出格式"):
+        create_exporter('xml', temp_dir)
+
+
+def test_pdf_copier(t: TestRunner):
+    """测试 PDFCopier"""
+    t.section("测试 PDFCopier")
+    
+    from matcher import MatchResult
+    
+    temp_dir = t.temp_dir("pdf_copier")
+    
+    src_pdf = temp_dir / "article.pdf"
+    src_pdf.write_bytes(b"%PDF-1.4 test content")
+    
+    match_results = [
+        MatchResult(0, Record(data={'uuid': 'u1'}), MatchStatus.MATCHED, [src_pdf]),
+        MatchResult(1, Record(data={'uuid': 'u1'}), MatchStatus.MATCHED, [src_pdf]),
+        MatchResult(2, Record(data={'uuid': 'u2'}), MatchStatus.MATCHED,
+                    [temp_dir / "missing.pdf"]),
+    ]
+    batch_result = BatchMatchResult(
+        source_name='test',
+        total_records=3,
+        total_pdfs=1,
+        results=match_results
+    )
+    
+    copier = PDFCopier(output_dir=temp_dir / "out")
+    stats = copier.copy_matched_pdfs(batch_result, uuid_field='uuid')
+    
+    t.assert_equal(stats['copied'], 1, "复制成功数量")
+    t.assert_equal(stats['skipped'], 1, "重复目标被跳过")
+    t.assert_equal(stats['failed'], 1, "源文件不存在计为失败")
+    t.assert_equal(
+        (temp_dir / "out" / "u1.pdf").read_bytes(),
+        src_pdf.read_bytes(),
+        "复制内容一致"
+    )
+    
+    # 再次复制：目标目录中已存在的文件被跳过，overwrite 时重新复制
+    stats = copier.copy_matched_pdfs(batch_result, uuid_field='uuid')
+    t.assert_equal((stats['copied'], stats['skipped']), (0, 2), "已存在的目标被跳过")
+    stats = copier.copy_matched_pdfs(batch_result, uuid_field='uuid', overwrite=True)
+    t.assert_equal((stats['copied'], stats['skipped']), (2, 0), "overwrite 时重新复制")
+    
+    # overwrite 时多条记录写同一目标，与逐条复制一样最后一条生效
+    other_pdf = temp_dir / "other.pdf"
+    other_pdf.write_bytes(b"%PDF-1.4 other content")
+    last_wins = BatchMatchResult(
+        source_name='test', total_records=2, total_pdfs=2,
+        results=[
+            MatchResult(0, Record(data={'uuid': 'u1'}), MatchStatus.MATCHED, [src_pdf]),
+            MatchResult(1, Record(data={'uuid': 'u1'}), MatchStatus.MATCHED, [other_pdf]),
         ]
-        
-        batch_result = BatchMatchResult(
-            source_name='test',
-            total_records=2,
-            total_pdfs=1,
-            results=match_results
-        )
-        
-        # 测试导出
-        exporter = CSVExporter(output_dir=temp_dir)
-        paths = exporter.export_all(
-            batch_result,
-            headers=['Title', 'DOI'],
-            field_mapping=CSV_FIELD_MAPPING
+    )
+    stats = copier.copy_matched_pdfs(last_wins, uuid_field='uuid', overwrite=True)
+    t.assert_equal(stats['copied'], 2, "overwrite 时同一目标的每个来源都计为复制")
+    t.assert_equal(
+        (temp_dir / "out" / "u1.pdf").read_bytes(),
+        other_pdf.read_bytes(),
+        "overwrite 时最后一个来源生效"
+    )
+    stats = copier.copy_matched_pdfs(last_wins, uuid_field='uuid')
+    t.assert_equal((stats['copied'], stats['skipped']), (0, 2), "不覆盖时已存在的目标被跳过")
+    
+    # 内核复制接口返回 0 而不复制时（空文件、procfs 等）回退到逐块复制
+    from exporters import _fast_copy
+    empty_pdf = temp_dir / "empty.pdf"
+    open(empty_pdf, "wb").close()
+    _fast_copy(empty_pdf, temp_dir / "empty_copy.pdf")
+    t.assert_equal((temp_dir / "empty_copy.pdf").read_bytes(), b"", "复制空文件")
+    proc_status = Path("/proc/self/status")
+    if proc_status.exists():
+        _fast_copy(proc_status, temp_dir / "status_copy")
+        t.assert_true((temp_dir / "status_copy").stat().st_size > 0, "复制不报告大小的 procfs 文件")
+    
+    # 源文件与目标文件相同时抛出 SameFileError，不截断源文件
+    import shutil
+    same_pdf = temp_dir / "same.pdf"
+    same_pdf.write_bytes(b"%PDF-1.4 same")
+    t.assert_raises(
+        shutil.SameFileError, lambda: _fast_copy(same_pdf, same_pdf), "复制到自身抛出 SameFileError"
+    )
+    t.assert_equal(same_pdf.read_bytes(), b"%PDF-1.4 same", "复制到自身不截断源文件")
+    # copy_file_range 不可用、走 sendfile 路径时同样先检查
+    import exporters
+    copy_file_range = exporters._copy_file_range
+    exporters._copy_file_range = lambda src, dst: False
+    try:
+        t.assert_raises(
+            shutil.SameFileError, lambda: _fast_copy(same_pdf, same_pdf), "sendfile 路径复制到自身抛出 SameFileError"
         )
-        
-        t.assert_true(paths['matched'] is not None, "导出匹配结果")
-        t.assert_true(paths['unmatched'] is not None, "导出未匹配结果")
-        
-        # 验证文件存在
-        if paths['matched']:
-            t.assert_true(paths['matched'].exists(), "匹配文件存在")
-            
+        _fast_copy(src_pdf, temp_dir / "sendfile_copy.pdf")
+    finally:
+        exporters._copy_file_range = copy_file_range
+    t.assert_equal(same_pdf.read_bytes(), b"%PDF-1.4 same", "sendfile 路径不截断源文件")
+    t.assert_equal(
+        (temp_dir / "sendfile_copy.pdf").read_bytes(), src_pdf.read_bytes(), "sendfile 路径复制内容一致"
+    )
+    same_batch = BatchMatchResult(
+        source_name='test', total_records=1, total_pdfs=1,
+        results=[MatchResult(0, Record(data={'uuid': 'same'}), MatchStatus.MATCHED, [same_pdf])]
+    )
+    stats = PDFCopier(output_dir=temp_dir).copy_matched_pdfs(
+        same_batch, uuid_field='uuid', overwrite=True
+    )
+    t.assert_equal(stats['failed'], 1, "复制目录即 PDF 目录时同名文件计为失败")
+    t.assert_equal(same_pdf.read_bytes(), b"%PDF-1.4 same", "overwrite 时不截断源文件")
+    
+    # 失效的符号链接按源文件不存在处理
+    dangling = temp_dir / "dangling.pdf"
+    dangling.symlink_to(temp_dir / "nowhere.pdf")
+    stats = copier.copy_matched_pdfs(BatchMatchResult(
+        source_name='test', total_records=1, total_pdfs=1,
+        results=[MatchResult(0, Record(data={}), MatchStatus.MATCHED, [dangling])]
+    ))
+    t.assert_equal(stats['failed_files'], [(str(dangling), "源文件不存在")], "失效符号链接计为源文件不存在")
+    
+    # 输出目录列表中没有的名称再用 exists() 确认：不区分大小写的文件系统上，
+    # 仅大小写不同的已有目标被跳过，区分大小写时正常复制
+    case_dir = temp_dir / "case_out"
+    case_dir.mkdir()
+    (case_dir / "U3.PDF").write_bytes(b"existing")
+    case_batch = BatchMatchResult(
+        source_name='test', total_records=1, total_pdfs=1,
+        results=[MatchResult(0, Record(data={'uuid': 'u3'}), MatchStatus.MATCHED, [src_pdf])]
+    )
+    expected = (0, 1) if (case_dir / "u3.pdf").exists() else (1, 0)
+    stats = PDFCopier(output_dir=case_dir).copy_matched_pdfs(case_batch, uuid_field='uuid')
+    t.assert_equal((stats['copied'], stats['skipped']), expected, "仅大小写不同的目标按文件系统处理")
+    t.assert_equal((case_dir / "U3.PDF").read_bytes(), b"existing", "已有目标未被覆盖")
+    
+    list_dir_names = exporters._list_dir_names
+    exporters._list_dir_names = lambda directory, files_only=False: (
+        set() if directory == case_dir else list_dir_names(directory, files_only)
+    )
+    try:
+        stats = PDFCopier(output_dir=case_dir).copy_matched_pdfs(case_batch, uuid_field='uuid')
     finally:
-        shutil.rmtree(temp_dir)
+        exporters._list_dir_names = list_dir_names
+    t.assert_equal((stats['copied'], stats['skipped']), (0, 1), "列表中缺失的已有目标由 exists() 发现")
+
+def test_csv_merger(t: TestRunner):
+    """测试 CSVMerger"""
+    t.section("测试 CSVMerger")
+    
+    import shutil
+    
+    temp_dir = t.temp_dir("csv_merger")
+    input_dir = temp_dir / "unmatched"
+    input_dir.mkdir()
+    
+    rows_by_file = {
+        'a_unmatched.csv': [['T1', '10.1/a'], ['T2', '10.1/b']],
+        'b_unmatched.csv': [['T2', '10.1/b'], ['T3', '10.1/c']],
+    }
+    for name, rows in rows_by_file.items():
+        with open(input_dir / name, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Title', 'DOI'])
+            writer.writerows(rows)
+    
+    # 隐藏文件和以 .csv 结尾的目录不参与合并
+    with open(input_dir / '.hidden.csv', 'w', encoding='utf-8-sig', newline='') as f:
+        csv.writer(f).writerows([['Title', 'DOI'], ['T9', '10.1/z']])
+    (input_dir / 'nested.csv').mkdir()
+    
+    output_path = temp_dir / "ALL_UNMATCHED.csv"
+    merger = CSVMerger()
+    count = merger.merge(
+        input_dir=input_dir,
+        output_path=output_path,
+        add_source_column=True,
+        add_doi_link=True,
+        deduplicate=True,
+        dedup_key='DOI',
+        exclude_keys={'10.1/a'}
+    )
+    
+    t.assert_equal(count, 2, "去重并排除后的记录数")
+    
+    with open(output_path, 'r', encoding='utf-8-sig', newline='') as f:
+        merged = list(csv.DictReader(f))
+    
+    t.assert_equal([r['DOI'] for r in merged], ['10.1/b', '10.1/c'], "合并顺序与去重")
+    t.assert_equal(merged[0]['Source'], 'a', "Source 列")
+    t.assert_equal(
+        merged[1]['DOI_Download_Link'],
+        'https://doi.org/10.1/c',
+        "DOI_Download_Link 列"
+    )
+    
+    keys = merger.collect_matched_keys(output_path)
+    t.assert_equal(keys, {'10.1/b', '10.1/c'}, "collect_matched_keys() 收集键值")
+    
+    # 合并时顺带收集键值，结果与事后读取输出文件一致
+    collect_count, collected = merger.merge_collecting_keys(
+        input_dir=input_dir,
+        output_path=temp_dir / "ALL_UNMATCHED_collect.csv",
+        key_column='DOI',
+        deduplicate=True,
+        dedup_key='DOI',
+        exclude_keys={'10.1/a'}
+    )
+    t.assert_equal(collect_count, count, "merge_collecting_keys() 记录数")
+    t.assert_equal(collected, keys, "merge_collecting_keys() 收集键值")
+    
+    # 汇总：已匹配的 DOI 从未匹配汇总中排除
+    summary_dir = temp_dir / "summary"
+    (summary_dir / "matched").mkdir(parents=True)
+    shutil.copytree(input_dir, summary_dir / "unmatched")
+    with open(summary_dir / "matched" / "a_matched.csv", 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Title', 'DOI'])
+        writer.writerow(['T3', '10.1/c'])
+    
+    summary = SummaryGenerator(summary_dir).generate_all_summaries()
+    t.assert_equal(summary, {'matched': 1, 'unmatched': 2}, "generate_all_summaries() 记录数")
 
 
 def test_match_result_properties(t: TestRunner):
     """测试 MatchResult 的属性方法"""
-    print("\n📋 测试 MatchResult 属性")
+    t.section("测试 MatchResult 属性")
     
     from matcher import MatchResult
     
@@ -484,11 +1103,16 @@ def test_match_result_properties(t: TestRunner):
         matched_pdfs=[Path('/test/file1.pdf'), Path('/test/file2.pdf')]
     )
     t.assert_true(multi.is_multi_matched, "is_multi_matched 为 True")
+    
+    # 使用 __slots__，实例没有 __dict__；copy.copy 仍可用
+    import copy
+    t.assert_false(hasattr(multi, '__dict__'), "MatchResult 使用 __slots__")
+    t.assert_equal(copy.copy(multi), multi, "copy.copy() 复制 MatchResult")
 
 
 def test_batch_match_result_properties(t: TestRunner):
     """测试 BatchMatchResult 的属性方法"""
-    print("\n📋 测试 BatchMatchResult 属性")
+    t.section("测试 BatchMatchResult 属性")
     
     from matcher import MatchResult
     
@@ -514,47 +1138,89 @@ def test_batch_match_result_properties(t: TestRunner):
     stats = batch.to_stats_dict()
     t.assert_equal(stats['matched'], 2, "to_stats_dict matched")
     t.assert_equal(stats['unmatched'], 1, "to_stats_dict unmatched")
-
+    t.assert_equal(
+        batch.status_counts(),
+        {MatchStatus.MATCHED: 2, MatchStatus.UNMATCHED: 1, MatchStatus.MULTI_MATCHED: 1},
+        "status_counts()"
+    )
+    
+    # 划分每次遍历 results；计数保存到 recount() 为止
+    batch.matched_results.clear()
+    t.assert_equal(batch.matched_count, 2, "返回的结果列表为副本")
+    batch.results.append(MatchResult(4, Record(data={}), MatchStatus.UNMATCHED))
+    t.assert_equal(batch.unmatched_count, 1, "修改 results 后计数不变")
+    batch.recount()
+    t.assert_equal(batch.unmatched_count, 2, "recount() 后重新统计")
+    batch.results[2] = MatchResult(2, Record(data={}), MatchStatus.MATCHED, [Path('/e.pdf')])
+    t.assert_equal(
+        [r.record_index for r in batch.matched_results], [0, 1, 2],
+        "原地替换元素后按原顺序重新划分"
+    )
+    batch.recount()
+    t.assert_equal(
+        (batch.matched_count, batch.unmatched_count),
+        (3, 1),
+        "原地替换元素后重新统计"
+    )
+    
+    # 计数只统计一次
+    counted = BatchMatchResult(source_name='test', total_records=1, total_pdfs=1)
+    counted.results.append(MatchResult(0, Record(data={}), MatchStatus.MATCHED, [Path('/a.pdf')]))
+    counted.recount()
+    counted.results = None  # 再次遍历 results 会抛出 TypeError
+    t.assert_equal(
+        (counted.matched_count, counted.match_rate, counted.to_stats_dict()['matched']),
+        (1, 1.0, 1),
+        "计数、匹配率和统计字典读取保存的计数"
+    )
 
 def test_import_all(t: TestRunner):
     """测试从 __init__.py 导入所有公共 API"""
-    print("\n📋 测试模块导入")
+    t.section("测试模块导入")
     
-    # 当直接运行脚本时，使用相对导入已经成功
-    # 这里验证 __init__.py 中声明的 __all__ 包含正确的导出
-    import importlib.util
+    # 验证 __init__.py 中声明的 __all__ 包含正确的导出
+    expected_exports = [
+        'DataSource', 'CSVDataSource', 'MongoDBDataSource',
+        'DataSourceResult', 'Record', 'FieldMapping',
+        'CSV_FIELD_MAPPING', 'MONGODB_FIELD_MAPPING', 'create_data_source',
+        'PDFMatcher', 'PDFNameAnalyzer', 'BatchMatchResult',
+        'MatchResult', 'MatchStatus', 'TextNormalizer',
+        'ResultExporter', 'CSVExporter', 'CSVMerger',
+        'SummaryGenerator', 'PDFCopier', 'generate_doi_url',
+    ]
     
-    init_path = Path(__file__).parent / '__init__.py'
-    spec = importlib.util.spec_from_file_location('match_pdfs_title_doi', init_path)
-    module = importlib.util.module_from_spec(spec)
+    try:
+        import match_pdfs_title_doi as package
+    except ImportError:
+        package = None
     
-    # 设置子模块路径
-    sys.modules['match_pdfs_title_doi'] = module
-    sys.modules['match_pdfs_title_doi.data_sources'] = __import__('data_sources')
-    sys.modules['match_pdfs_title_doi.matcher'] = __import__('matcher')
-    sys.modules['match_pdfs_title_doi.exporters'] = __import__('exporters')
+    if package is not None:
+        declared = set(package.__all__)
+        namespace = vars(package)
+    else:
+        # 直接运行脚本时包不在 sys.path 上：静态读取 __all__，
+        # 在脚本启动时已导入的子模块中查找这些名称
+        import ast
+        tree = ast.parse((Path(__file__).parent / '__init__.py').read_text(encoding='utf-8'))
+        declared = next(
+            set(ast.literal_eval(node.value))
+            for node in tree.body
+            if isinstance(node, ast.Assign)
+            and any(isinstance(target, ast.Name) and target.id == '__all__' for target in node.targets)
+        )
+        namespace = {}
+        for module_name in ('data_sources', 'matcher', 'exporters'):
+            namespace.update(vars(sys.modules[module_name]))
     
-    try:
-        spec.loader.exec_module(module)
-        
-        # 验证 __all__ 中声明的所有导出
-        expected_exports = [
-            'DataSource', 'CSVDataSource', 'MongoDBDataSource',
-            'DataSourceResult', 'Record', 'FieldMapping',
-            'CSV_FIELD_MAPPING', 'MONGODB_FIELD_MAPPING', 'create_data_source',
-            'PDFMatcher', 'PDFNameAnalyzer', 'BatchMatchResult',
-            'MatchResult', 'MatchStatus', 'TextNormalizer',
-            'ResultExporter', 'CSVExporter', 'CSVMerger',
-            'SummaryGenerator', 'PDFCopier', 'generate_doi_url',
-        ]
-        
-        missing = [name for name in expected_exports if not hasattr(module, name)]
-        if missing:
-            t.assert_true(False, f"缺少导出: {missing}")
-        else:
-            t.assert_true(True, "所有公共 API 可正常导入")
-    except Exception as e:
-        t.assert_true(False, f"导入失败: {e}")
+    missing = [name for name in expected_exports if name not in declared or name not in namespace]
+    t.assert_false(
+        {'JSONLExporter', 'create_exporter'} & declared,
+        "JSONL 导出在命令行和汇总支持前不在 __all__ 中"
+    )
+    if missing:
+        t.assert_true(False, f"缺少导出: {missing}")
+    else:
+        t.assert_true(True, "所有公共 API 可正常导入")
 
 
 def main():
@@ -565,19 +1231,33 @@ def main():
     
     t = TestRunner()
     
-    # 运行所有测试
-    test_text_normalizer(t)
-    test_pdf_name_analyzer(t)
-    test_field_mapping(t)
-    test_record(t)
-    test_data_source_result(t)
-    test_csv_data_source(t)
-    test_generate_doi_url(t)
-    test_match_result_properties(t)
-    test_batch_match_result_properties(t)
-    test_pdf_matcher(t)
-    test_csv_exporter(t)
-    test_import_all(t)
+    # 运行所有测试（每个测试后清空匹配器的结果缓存，避免测试之间相互影响）
+    tests = [
+        test_text_normalizer,
+        test_pdf_name_analyzer,
+        test_field_mapping,
+        test_record,
+        test_data_source_result,
+        test_csv_data_source,
+        test_generate_doi_url,
+        test_match_result_properties,
+        test_batch_match_result_properties,
+        test_pdf_scanner,
+        test_pdf_matcher,
+        test_csv_exporter,
+        test_pdf_copier,
+        test_csv_merger,
+        test_import_all,
+    ]
+    try:
+        for test in tests:
+            try:
+                test(t)
+            finally:
+                t.flush()
+                clear_caches()
+    finally:
+        t.cleanup()
     
     # 输出摘要
     success = t.summary()